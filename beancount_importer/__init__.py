@@ -1,17 +1,20 @@
 import importlib.metadata
+from typing import Any
+from typing import TYPE_CHECKING
 
-from .activobank import ActivobankImporter
-from .amex import AmexImporter
-from .brim import BrimImporter
-from .chase import ChaseImporter
-from .eq import EqImporter
-from .milleniumbcp import MilleniumbcpImporter
-from .paypal import PaypalImporter
-from .rbc import RbcImporter
-from .remitbee import RemitbeeImporter
-from .revolut import RevolutImporter
-from .tangerine import TangerineImporter
-from .wealthsimple import WealthsimpleImporter
+if TYPE_CHECKING:
+    from .activobank import ActivobankImporter
+    from .amex import AmexImporter
+    from .brim import BrimImporter
+    from .chase import ChaseImporter
+    from .eq import EqImporter
+    from .milleniumbcp import MilleniumbcpImporter
+    from .paypal import PaypalImporter
+    from .rbc import RbcImporter
+    from .remitbee import RemitbeeImporter
+    from .revolut import RevolutImporter
+    from .tangerine import TangerineImporter
+    from .wealthsimple import WealthsimpleImporter
 
 
 __version__ = importlib.metadata.version('beancount-importer')
@@ -29,3 +32,34 @@ __all__ = [
     'TangerineImporter',
     'WealthsimpleImporter',
 ]
+
+# N.B. importers are only loaded on first access, since their dependencies are
+# slow to import
+_MODULES = {
+    'ActivobankImporter': 'activobank',
+    'AmexImporter': 'amex',
+    'BrimImporter': 'brim',
+    'ChaseImporter': 'chase',
+    'EqImporter': 'eq',
+    'MilleniumbcpImporter': 'milleniumbcp',
+    'PaypalImporter': 'paypal',
+    'RbcImporter': 'rbc',
+    'RemitbeeImporter': 'remitbee',
+    'RevolutImporter': 'revolut',
+    'TangerineImporter': 'tangerine',
+    'WealthsimpleImporter': 'wealthsimple',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module = importlib.import_module(f'.{_MODULES[name]}', __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
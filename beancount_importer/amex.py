@@ -1,8 +1,8 @@
 import re
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
 from .utils import Importer
 
@@ -13,11 +13,11 @@ class AmexImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction:
         # TODO: check if splitting is necessary
-        date = parse(row['Date'].split(' ')[0]).date()
+        date = self._date(row['Date'].split(' ')[0])
         # TODO: parse out payee vs narration?
         narration = row['Description']
         amt = -self._amount(row['Amount'])
@@ -0,0 +1,245 @@
+import collections
+import importlib
+import re
+import sys
+import time
+from collections.abc import Iterable
+from typing import Any
+from typing import TextIO
+
+import beangulp.utils  # type: ignore[import-untyped]
+import click
+from beancount.core import data
+
+from .ingest import Context
+from .patterns import AccountPattern
+
+
+Key = tuple[str, str, str, str | None]
+
+# N.B. the parser behind re.compile(), which is private (and untyped): it has
+# been re._parser since Python 3.11 (the oldest we support) and the parse trees
+# read here have kept the same shape since. tests/audit_test.py checks them
+# against the running Python, should a new release ever change either.
+_parser: Any = importlib.import_module('re._parser')
+_constants: Any = importlib.import_module('re._constants')
+_repeats = (_constants.MAX_REPEAT, _constants.MIN_REPEAT)
+
+
+def _key(pattern: AccountPattern) -> Key:
+    # the same config entry is shared by the pattern list of every account
+    return (
+        pattern.target.value, pattern.account, pattern.pattern.pattern,
+        pattern.flag,
+    )
+
+
+def _children(op: Any, av: Any) -> list[Any]:
+    if op in _repeats:
+        return [av[2]]
+    if op == _constants.SUBPATTERN:
+        return [av[3]]
+    if op == _constants.BRANCH:
+        return list(av[1])
+    if op in (_constants.ASSERT, _constants.ASSERT_NOT):
+        return [av[1]]
+    if op == _constants.GROUPREF_EXISTS:
+        return [x for x in av[1:] if x is not None]
+    # N.B. atomic groups and possessive repeats never backtrack
+    return []
+
+
+def _first(body: Any) -> Any:
+    # N.B. the body of a repeat may be empty (eg. `(?:)*`)
+    items = list(body)
+    return items[0][0] if items else None
+
+
+def _unbounded(op: Any, av: Any) -> bool:
+    return op in _repeats and av[1] == _constants.MAXREPEAT
+
+
+def _quantified(items: Iterable[tuple[Any, Any]]) -> bool:
+    """Whether any of items contains an unbounded repeat."""
+    return any(
+        _unbounded(op, av) or any(_quantified(x) for x in _children(op, av))
+        for op, av in items
+    )
+
+
+def _scan(items: list[tuple[Any, Any]], found: set[str]) -> None:
+    for i, (op, av) in enumerate(items):
+        if _unbounded(op, av):
+            body = list(av[2])
+            if _quantified(body):
+                found.add('nested quantifiers')
+            if i and _unbounded(*items[i - 1]):
+                previous = list(items[i - 1][1][2])
+                wildcard = _constants.ANY in (_first(body), _first(previous))
+                if (body and body == previous) or wildcard:
+                    found.add('adjacent overlapping quantifiers')
+
+        for x in _children(op, av):
+            _scan(list(x), found)
+
+
+def risks(pattern: re.Pattern[str]) -> list[str]:
+    """
+    Find the constructs of pattern known to backtrack heavily on a miss.
+
+    This is a heuristic: it flags nested unbounded quantifiers (eg.
+    `(\\w+ ?)*`), adjacent ones over the same characters (eg. `.*.*`) and
+    unanchored leading ones (eg. `.*x`), which search() retries from every
+    position of the string.
+    """
+    items = list(_parser.parse(pattern.pattern, pattern.flags))
+    found: set[str] = set()
+    _scan(items, found)
+    if items and _unbounded(*items[0]):
+        op = _first(items[0][1][2])
+        if op in (_constants.ANY, _constants.IN, _constants.CATEGORY):
+            found.add('unanchored leading quantifier')
+    return sorted(found)
+
+
+class Usage:
+    """The cost and outcome of evaluating one pattern against transactions."""
+
+    def __init__(self, number: int, pattern: AccountPattern) -> None:
+        self.number = number
+        self.pattern = pattern
+        self.nanoseconds = 0
+        self.slowest = 0
+        # transactions matched, and those for which it was the first match
+        self.hits = 0
+        self.first = 0
+        # the earlier patterns which matched instead, by number
+        self.shadowed_by: collections.Counter[int] = collections.Counter()
+
+    def notes(self) -> list[str]:
+        notes = []
+        if not self.hits:
+            notes.append('never matched')
+        elif not self.first:
+            number, _ = self.shadowed_by.most_common(1)[0]
+            notes.append(f'shadowed (eg. by #{number})')
+        return notes + risks(self.pattern.pattern)
+
+
+class Audit:
+    """
+    Replay transactions through every pattern in order, as AccountPattern does.
+
+    Unlike PatternMatcher, every pattern is evaluated separately against every
+    transaction (there is no fusing and no caching) so that each can be timed
+    and every hit counted, even those after the first match.
+    """
+
+    def __init__(self) -> None:
+        self.usages: dict[Key, Usage] = {}
+        self.transactions = 0
+
+    def _usages(self, account_patterns: list[AccountPattern]) -> list[Usage]:
+        return [
+            self.usages.setdefault(
+                _key(x), Usage(len(self.usages) + 1, x),
+            )
+            for x in account_patterns
+        ]
+
+    def replay(
+            self,
+            account_patterns: list[AccountPattern],
+            txs: Iterable[data.Transaction],
+    ) -> None:
+        usages = self._usages(account_patterns)
+        for tx in txs:
+            self.transactions += 1
+            first = None
+            for usage in usages:
+                start = time.perf_counter_ns()
+                hit = usage.pattern.matches(tx)
+                elapsed = time.perf_counter_ns() - start
+
+                usage.nanoseconds += elapsed
+                usage.slowest = max(usage.slowest, elapsed)
+                if not hit:
+                    continue
+
+                usage.hits += 1
+                if first is None:
+                    first = usage
+                    usage.first += 1
+                else:
+                    usage.shadowed_by[first.number] += 1
+
+    def report(self, out: TextIO, order: str) -> None:
+        usages = list(self.usages.values())
+        if order == 'time':
+            usages.sort(key=lambda x: x.nanoseconds, reverse=True)
+
+        rows: list[tuple[Any, ...]] = [
+            ('#', 'ms', 'max us', 'hits', 'first', 'pattern', 'notes'),
+        ]
+        for x in usages:
+            rows.append((
+                x.number,
+                f'{x.nanoseconds / 1e6:.3f}',
+                f'{x.slowest / 1e3:.1f}',
+                x.hits,
+                x.first,
+                f'{x.pattern.target.value} {x.pattern.account} '
+                f'/{x.pattern.pattern.pattern}/',
+                ', '.join(x.notes()),
+            ))
+        widths = [max(len(str(x[i])) for x in rows) for i in range(6)]
+        for row in rows:
+            cells = (
+                str(x).ljust(w) if i == 5 else str(x).rjust(w)
+                for i, (x, w) in enumerate(zip(row, widths))
+            )
+            out.write(('  '.join([*cells, row[6]])).rstrip() + '\n')
+
+        total = sum(x.nanoseconds for x in usages) / 1e6
+        unused = sum(1 for x in usages if not x.first)
+        out.write(
+            f'{len(usages)} patterns, {self.transactions} transactions, '
+            f'{total:.3f}ms; {unused} patterns were never the first match\n',
+        )
+
+
+@click.group()
+def patterns() -> None:
+    """Inspect the configured patterns."""
+
+
+@patterns.command()
+@click.argument('src', nargs=-1, type=click.Path(exists=True))
+@click.option(
+    '--sort', 'order', type=click.Choice(['time', 'config']), default='time',
+    show_default=True, help='List patterns by total time or in config order.',
+)
+@click.pass_obj
+def profile(ctx: Context, src: tuple[str, ...], order: str) -> None:
+    """
+    Profile the patterns against the transactions of documents.
+
+    Every transaction extracted from the SRC list of files or directories is
+    run through each pattern of its account, reporting the time spent in each
+    pattern, how many transactions it matched, and how many of those it was
+    the first to match. Patterns which never come first (never matched, or
+    shadowed by an earlier pattern) can be pruned or reordered; patterns prone
+    to backtracking are flagged as well.
+    """
+    audit = Audit()
+    for fname in beangulp.utils.walk(src):
+        try:
+            importer = ctx.dispatcher.identify(fname)
+            if importer is None:
+                continue
+            # pylint: disable=protected-access
+            audit.replay(importer.account_patterns, importer._rows(fname))
+        except Exception as e:
+            click.echo(f'ERROR: {fname}: {e}', err=True)
+
+    audit.report(sys.stdout, order)
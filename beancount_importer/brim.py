@@ -1,10 +1,10 @@
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
 from .utils import Importer
 
@@ -15,10 +15,10 @@ class BrimImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
-        date = parse(row['Transaction Date']).date()
+        date = self._date(row['Transaction Date'])
         narration = row['Description']
         amt = -self._amount(row['Amount'])
 
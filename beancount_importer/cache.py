@@ -0,0 +1,254 @@
+import collections
+import contextlib
+import gc
+import hashlib
+import importlib.metadata
+import os
+import pathlib
+import pickle
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+from typing import TypeAlias
+
+import beancount
+from beancount.core import data
+
+
+FileKey: TypeAlias = tuple[str, int, int]
+Stamp: TypeAlias = tuple[str, int, int, str]
+
+VERSION = importlib.metadata.version('beancount-importer')
+
+
+def file_key(fname: str) -> FileKey:
+    stat = os.stat(fname)
+    return os.path.realpath(fname), stat.st_size, stat.st_mtime_ns
+
+
+class ExtractCache:
+    """
+    Bounded LRU of extracted transactions, keyed by file path and stat.
+
+    A file which is modified after being cached gets a new key, so stale
+    results are never returned; they are dropped when the file is next read.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[
+            FileKey, list[data.Transaction]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+            self,
+            fname: str,
+            factory: Callable[[str], list[data.Transaction]],
+    ) -> list[data.Transaction]:
+        key = file_key(fname)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.invalidate(fname)
+        value = factory(fname)
+        if self.maxsize > 0:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, fname: str | None = None) -> None:
+        if fname is None:
+            self._entries.clear()
+            return
+
+        path = os.path.realpath(fname)
+        for key in [x for x in self._entries if x[0] == path]:
+            del self._entries[key]
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk store of parsed (but uncategorized) rows.
+
+    Entries are keyed by the sha256 of the statement plus the importer
+    parameters which affect parsing, and live under a directory per package
+    version and importer class so that parser changes never see stale rows.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+
+    def entry(
+            self,
+            fname: str,
+            namespace: str,
+            params: tuple[Any, ...],
+    ) -> pathlib.Path:
+        with open(fname, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256')
+        digest.update(repr(params).encode('utf-8'))
+        return self.path / VERSION / namespace / f'{digest.hexdigest()}.pickle'
+
+    def get(
+            self,
+            fname: str,
+            namespace: str,
+            params: tuple[Any, ...],
+            factory: Callable[[str], list[data.Transaction]],
+    ) -> list[data.Transaction]:
+        entry = self.entry(fname, namespace, params)
+        try:
+            with entry.open('rb') as f:
+                value = cast(list[data.Transaction], pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        else:
+            # the same statement may have been re-downloaded elsewhere
+            for x in value:
+                x.meta['filename'] = fname
+            return value
+
+        value = factory(fname)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f'.{os.getpid()}.tmp')
+        with tmp.open('wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(entry)
+        return value
+
+
+def file_digest(fname: str) -> str:
+    with open(fname, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _stamp(fname: str) -> Stamp:
+    stat = os.stat(fname)
+    return fname, stat.st_size, stat.st_mtime_ns, file_digest(fname)
+
+
+def _fresh(stamp: Stamp) -> bool:
+    fname, size, mtime, digest = stamp
+    try:
+        stat = os.stat(fname)
+        if stat.st_size != size:
+            return False
+        # N.B. only hash files which were touched, since that is slow
+        return stat.st_mtime_ns == mtime or file_digest(fname) == digest
+    except OSError:
+        return False
+
+
+@contextlib.contextmanager
+def paused_gc() -> Iterator[None]:
+    # unpickling allocates enough objects to trigger many (pointless) passes
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class LedgerCache:
+    """
+    On-disk store of the entries loaded from a ledger, across runs.
+
+    Each entry starts with the version of beancount and a stamp of every file
+    the ledger depends on (its includes and plugins), so it can be checked
+    without unpickling the (much larger) entries. A file is only re-hashed
+    when its size or mtime changed, so merely touching one doesn't force a
+    reload.
+
+    N.B. beancount keeps a .picklecache of its own next to the ledger, but
+    this one only holds the entries and is unpickled with the gc paused: on a
+    ledger of 60k transactions, a hit takes about 0.4s, against 0.7s for a hit
+    of beancount's and 3.7s for an uncached load. Misses still go through
+    beancount's.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path) / VERSION / 'ledger'
+
+    def get(
+            self,
+            fname: str,
+            factory: Callable[[str], tuple[list[data.Directive], list[str]]],
+    ) -> list[data.Directive]:
+        """Load fname, where factory returns its entries and dependencies."""
+        return self.load(fname, factory)[1]
+
+    def load(
+            self,
+            fname: str,
+            factory: Callable[[str], tuple[list[data.Directive], list[str]]],
+    ) -> tuple[list[Stamp], list[data.Directive]]:
+        """Load fname as get(), along with the stamps of its dependencies."""
+        fname = os.path.realpath(fname)
+        name = hashlib.sha256(fname.encode('utf-8')).hexdigest()
+        entry = self.path / f'{name}.pickle'
+        try:
+            with entry.open('rb') as f:
+                version, stamps = cast(tuple[str, list[Stamp]], pickle.load(f))
+                if (version == beancount.__version__
+                        and all(_fresh(x) for x in stamps)):
+                    with paused_gc():
+                        entries = pickle.load(f)
+                    return stamps, cast(list[data.Directive], entries)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            pass
+
+        entries, includes = factory(fname)
+        stamps = [_stamp(x) for x in includes]
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f'.{os.getpid()}.tmp')
+        with tmp.open('wb') as f:
+            header = beancount.__version__, stamps
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(entry)
+        return stamps, entries
+
+
+class LedgerMemo(LedgerCache):
+    """
+    In-memory store of the entries loaded from a ledger, within a process.
+
+    Meant for long-lived processes, such as ``bean-import serve``. Entries are
+    checked against the stamps of the files the ledger depends on at every
+    get(), exactly as on disk, so the ledger is only reloaded once one of them
+    changes. Loads go through the on-disk store, if one is set.
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, store: LedgerCache | None = None) -> None:
+        self.store = store
+        self._entries: dict[
+            str, tuple[list[Stamp], list[data.Directive]]
+        ] = {}
+
+    def load(
+            self,
+            fname: str,
+            factory: Callable[[str], tuple[list[data.Directive], list[str]]],
+    ) -> tuple[list[Stamp], list[data.Directive]]:
+        fname = os.path.realpath(fname)
+        cached = self._entries.get(fname)
+        if cached is None or not all(_fresh(x) for x in cached[0]):
+            if self.store is not None:
+                cached = self.store.load(fname, factory)
+            else:
+                entries, includes = factory(fname)
+                cached = [_stamp(x) for x in includes], entries
+            self._entries[fname] = cached
+
+        # N.B. callers (eg. extract) add to the list they are handed
+        stamps, entries = cached
+        return stamps, list(entries)
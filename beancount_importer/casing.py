@@ -0,0 +1,38 @@
+import enum
+import functools
+import string
+from typing import cast
+
+
+class Casing(str, enum.Enum):
+    NONE = 'none'
+    SIMPLE = 'simple'
+    TITLECASE = 'titlecase'
+
+
+# N.B. lru_cache is thread-safe, and each worker process gets its own copy
+@functools.lru_cache(maxsize=8192)
+def _titlecase(x: str) -> str:
+    # pylint: disable=import-outside-toplevel
+    import titlecase
+    return cast(str, titlecase.titlecase(x))
+
+
+@functools.lru_cache(maxsize=8192)
+def _simple(x: str) -> str:
+    return string.capwords(x)
+
+
+def normalize(x: str, casing: Casing = Casing.TITLECASE) -> str:
+    """
+    Normalize the casing of a payee or narration.
+
+    Full titlecasing handles small words, acronyms, etc but is fairly slow;
+    SIMPLE capitalizes each word and NONE leaves the text as-is, which may be
+    preferable for large backfills.
+    """
+    if casing == Casing.TITLECASE:
+        return _titlecase(x)
+    if casing == Casing.SIMPLE:
+        return _simple(x)
+    return x
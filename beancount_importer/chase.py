@@ -1,11 +1,12 @@
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
+from .schema import Schema
 from .utils import Importer
 
 
@@ -16,6 +17,13 @@ class ChaseImporter(Importer):
         r'Chase(\d{4})_Activity[\d_]+.CSV',
         re.IGNORECASE,
     )
+    _schemas = (
+        Schema(
+            date=('Posting Date', 'Post Date'),
+            description='Description',
+            amount='Amount',
+        ),
+    )
 
     regex_desc_full = re.compile(
         (
@@ -51,13 +59,12 @@ class ChaseImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
-        post_date = row.get('Posting Date') or row['Post Date']
-        date = parse(post_date).date()
-        payee, narration = self._parse_description(row['Description'])
-        amt = self._amount(row['Amount'])
+        date = self._date(row['date'])
+        payee, narration = self._parse_description(row['description'])
+        amt = self._amount(row['amount'])
         # TODO: move to base class
         if amt == self._amount('0'):
             return None
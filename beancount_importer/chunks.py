@@ -0,0 +1,70 @@
+import csv
+import io
+from collections.abc import Iterator
+from typing import NamedTuple
+
+
+class Chunk(NamedTuple):
+    """A byte range of whole records of a csv file."""
+    start: int
+    end: int
+    # the number of (non-empty) records before it, see Importer._extract()
+    lineno: int
+
+
+def _lines(f: io.BufferedReader, offset: list[int]) -> Iterator[str]:
+    # N.B. csv.reader only pulls as many lines as each record needs, so the
+    # offset is always at the end of the last record read
+    for i, line in enumerate(f):
+        offset[0] += len(line)
+        yield line.decode('utf-8' if i else 'utf-8-sig')
+
+
+def plan(
+        fname: str,
+        size: int,
+        head: int = 2**16,
+) -> tuple[list[str], list[Chunk]] | None:
+    """
+    Break the records of a csv file into chunks of roughly size bytes.
+
+    The file is read once through csv.reader, since quoted values may span
+    lines: a naive split on newlines could land in the middle of a record.
+    The first chunk is kept under head bytes, so that it can be parsed before
+    the others to sniff the date format.
+
+    Returns the header and the chunks of records after it, or None if the
+    file can't be split exactly (eg. it has no records, is not utf-8, or
+    uses bare carriage returns as line endings).
+    """
+    offset = [0]
+    chunks: list[Chunk] = []
+    with open(fname, 'rb') as f:
+        reader = csv.reader(_lines(f, offset))
+        try:
+            header = next(reader, None)
+            if header is None:
+                return None
+
+            start, lineno, count, target = offset[0], 0, 0, head
+            for record in reader:
+                count += bool(record)
+                if offset[0] - start >= target:
+                    chunks.append(Chunk(start, offset[0], lineno))
+                    start, lineno, target = offset[0], count, size
+        except (csv.Error, UnicodeDecodeError):
+            return None
+
+    if offset[0] > start:
+        chunks.append(Chunk(start, offset[0], lineno))
+    return (header, chunks) if chunks else None
+
+
+def records(fname: str, chunk: Chunk) -> Iterator[list[str]]:
+    """Read the records of chunk, as csv.reader() on the whole file would."""
+    with open(fname, 'rb') as f:
+        f.seek(chunk.start)
+        raw = f.read(chunk.end - chunk.start)
+
+    # N.B. translates newlines as open() does in text mode
+    yield from csv.reader(io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8'))
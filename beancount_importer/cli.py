@@ -1,53 +1,55 @@
+import datetime
+import os
 import pathlib
-import re
 import tomllib
 from collections.abc import Iterable
 from typing import Any
 from typing import cast
 from typing import Protocol
 
-import beangulp  # type: ignore[import-untyped]
+import beangulp.utils  # type: ignore[import-untyped]
 import click
-import sh
 from beancount.core import data
 
-from .activobank import ActivobankImporter
-from .amex import AmexImporter
-from .brim import BrimImporter
-from .chase import ChaseImporter
-from .eq import EqImporter
-from .milleniumbcp import MilleniumbcpImporter
-from .paypal import PaypalImporter
-from .rbc import RbcImporter
-from .remitbee import RemitbeeImporter
-from .revolut import RevolutImporter
-from .santander import SantanderImporter
-from .tangerine import TangerineImporter
-from .utils import AccountPattern
+from . import audit
+from . import daemon
+from . import ingest
+from . import ledger
+from .cache import LedgerCache
+from .cache import ParseCache
+from .casing import Casing
+from .dispatch import Dispatcher
+from .manifest import Manifest
+from .patterns import AccountPattern
+from .registry import LazyImporters
 from .utils import Importer
-from .wealthsimple import WealthsimpleCreditCardImporter
-from .wealthsimple import WealthsimpleImporter
 
 
 # TODO: enable beangulp type checking once it has a py.typed
 # https://github.com/beancount/beangulp/pull/141
 
 
-IMPORTERS: dict[str, type[Importer]] = {
-    'activobank': ActivobankImporter,
-    'amex': AmexImporter,
-    'brim': BrimImporter,
-    'chase': ChaseImporter,
-    'eq': EqImporter,
-    'milleniumbcp': MilleniumbcpImporter,
-    'paypal': PaypalImporter,
-    'rbc': RbcImporter,
-    'remitbee': RemitbeeImporter,
-    'revolut': RevolutImporter,
-    'santander': SantanderImporter,
-    'tangerine': TangerineImporter,
-    'wealthsimple': WealthsimpleImporter,
-    'wealthsimple-credit-card': WealthsimpleCreditCardImporter,
+IMPORTERS = LazyImporters({
+    'activobank': 'activobank:ActivobankImporter',
+    'amex': 'amex:AmexImporter',
+    'brim': 'brim:BrimImporter',
+    'chase': 'chase:ChaseImporter',
+    'eq': 'eq:EqImporter',
+    'milleniumbcp': 'milleniumbcp:MilleniumbcpImporter',
+    'paypal': 'paypal:PaypalImporter',
+    'rbc': 'rbc:RbcImporter',
+    'remitbee': 'remitbee:RemitbeeImporter',
+    'revolut': 'revolut:RevolutImporter',
+    'santander': 'santander:SantanderImporter',
+    'tangerine': 'tangerine:TangerineImporter',
+    'wealthsimple': 'wealthsimple:WealthsimpleImporter',
+    'wealthsimple-credit-card': 'wealthsimple:WealthsimpleCreditCardImporter',
+})
+
+
+# Top-level keys of the config section which are not importer definitions.
+SETTINGS = {
+    'cache', 'casing', 'chunk-size', 'dedupe-window', 'manifest', 'patterns',
 }
 
 
@@ -77,16 +79,24 @@ class Hook(Protocol):
 # See https://github.com/beancount/beangulp/blob/v0.2.0/beangulp/__init__.py
 class Ctx:
     def __init__(self) -> None:
-        self.importers = list(self.build_importers())
+        config = self.load_config()
+        self.importers = list(self.build_importers(config))
+        self.dispatcher = Dispatcher(self.importers)
         self.hooks: list[Hook] = []
+        self.ledger_cache = None
+        if config.get('cache'):
+            self.ledger_cache = LedgerCache(config['cache'])
+        self.manifest = None
+        if config.get('manifest'):
+            self.manifest = Manifest(config['manifest'])
 
     @classmethod
-    def load_config(cls) -> dict[str, list[Any]]:
+    def load_config(cls) -> dict[str, Any]:
         try:
             fname = pathlib.Path('./config.toml')
             with fname.open('rb') as f:
                 config = tomllib.load(f)['beancount-importer']
-                return cast(dict[str, list[Any]], config)
+                return cast(dict[str, Any], config)
         except KeyError as e:
             click.echo('No beancount-importer section in config.', err=True)
             raise click.Abort() from e
@@ -95,16 +105,24 @@ class Ctx:
             raise click.Abort() from e
 
     @classmethod
-    def build_importers(cls) -> Iterable[Importer]:
-        config = cls.load_config()
+    def build_importers(cls, config: dict[str, Any]) -> Iterable[Importer]:
+        casing = Casing(config.get('casing', Casing.TITLECASE))
+        chunk_size = config.get('chunk-size')
+        dedupe_window = int(config.get('dedupe-window', 2))
+        parse_cache = None
+        if config.get('cache'):
+            parse_cache = ParseCache(config['cache'])
+        patterns = [
+            AccountPattern.from_config(x) for x in config.get('patterns', [])
+        ]
 
-        patterns: list[AccountPattern] = []
         for section, definitions in config.items():
-            if section == 'patterns':
-                patterns = [AccountPattern.from_config(x) for x in definitions]
+            if section in SETTINGS:
                 continue
 
             for definition in definitions:
+                # N.B. configured in MiB
+                mib = definition.get('chunk-size', chunk_size)
                 yield IMPORTERS[section](
                     definition['account'],
                     account_patterns=(
@@ -113,8 +131,14 @@ class Ctx:
                             for x in definition.get('patterns', [])
                         ]
                     ),
+                    casing=definition.get('casing', casing),
+                    chunk_size=None if mib is None else int(mib * 2**20),
                     currency=definition.get('currency'),
+                    dedupe_window=definition.get(
+                        'dedupe-window', dedupe_window,
+                    ),
                     lastfour=definition.get('lastfour'),
+                    parse_cache=parse_cache,
                 )
 
 
@@ -126,99 +150,57 @@ def run(ctx: click.Context) -> None:
 
 
 @run.command()
-@click.argument('src')
-def split(src: str) -> None:
+@click.argument('src', type=click.Path(exists=True))
+@click.pass_obj
+def split(ctx: Ctx, src: str) -> None:
     """Split merged downloaded files into independent ones."""
-    # pylint: disable=too-complex,too-many-locals,too-many-branches
-    config = Ctx.load_config()
-
-    # rbc
-    definitions = config.get('rbc') or []
-    if len(definitions) > 2:
-        merged_regex = re.compile(r'csv\d+\.csv')
-        for (dirpath, _dirnames, filenames) in pathlib.Path(src).walk():
-            for fname in filenames:
-                if not merged_regex.match(fname):
-                    continue
-
-                fpath = dirpath / fname
-                click.echo(f'Found grouped RBC csv {fpath}...')
-                with fpath.open('r') as f:
-                    lines = f.readlines()
-
-                for definition in definitions:
-                    lastfour = definition['lastfour']
-                    new_fname = dirpath / f'rbc{lastfour}.{fname}'
-                    click.echo(f'* writing data for {lastfour} to {new_fname}')
-                    with new_fname.open('w') as f:
-                        f.write(lines[0])
-                        for x in lines:
-                            if x.split(',')[1].endswith(lastfour):
-                                f.write(x)
-
-                click.echo(f'Deleting {fpath}')
-                fpath.unlink()
-
-    # TODO: merge with rbc implementation (rbc doesn't track bad accounts!) and
-    # dedupe. Move into importer?
-    # wealthsimple
-    definitions = config.get('wealthsimple') or []
-    if len(definitions) >= 2:
-        merged_regex = re.compile(r'^activities-export-\d+-\d+-\d+\.csv')
-        for (dirpath, _dirnames, filenames) in pathlib.Path(src).walk():
-            for fname in filenames:
-                if not merged_regex.match(fname):
-                    continue
-
-                fpath = dirpath / fname
-                click.echo(f'Found grouped Wealthsimple csv {fpath}...')
-                with fpath.open('r') as f:
-                    lines = f.readlines()
-
-                header = lines[0]
-                body = []
-                accounts = {}
-                for x in lines[1:]:
-                    if x.strip() and not x.startswith('"As of '):
-                        body.append(x)
-                        accid = x.split(',')[2]
-                        accounts[accid[5:-3]] = accid
-
-                prefix = 'monthly-statement-transactions-'
-                for accid in accounts.values():
-                    new_fname = dirpath / f'{prefix}{accid}-0.csv'
-                    click.echo(f'* writing data for {accid} to {new_fname}')
-                    with new_fname.open('w') as f:
-                        f.write(header)
-                        for x in body:
-                            if x.split(',')[2] == accid:
-                                f.write(x)
-
-                click.echo(f'Deleting {fpath}')
-                fpath.unlink()
-
-                for lastfour, accid in accounts.items():
-                    if lastfour not in {x['lastfour'] for x in definitions}:
-                        click.echo(f'No definition for: {accid}', err=True)
+    kinds = list(dict.fromkeys(type(x) for x in ctx.importers))
+    for fname in beangulp.utils.walk([src]):
+        kind = next((x for x in kinds if x.is_merged(fname)), None)
+        if not kind:
+            continue
+
+        click.echo(f'Found merged {kind.__name__} export {fname}...')
+        for account, new_fname in kind.split(fname).items():
+            click.echo(f'* wrote data for {account} to {new_fname}')
+            if not ctx.dispatcher.candidates(new_fname):
+                click.echo(f'No definition for: {account}', err=True)
+
+        click.echo(f'Deleting {fname}')
+        os.unlink(fname)
+
+
+def _last_dates(
+        cache: LedgerCache | None,
+        accounts: list[str],
+) -> dict[str, datetime.date]:
+    """
+    Find the date of the last transaction of each account.
+
+    Importers may ask for the same account several times, so we look them all
+    up front from a single (possibly cached) load of the ledger, rather than
+    running bean-query for each.
+    """
+    # TODO: can this include balance statements?
+    if cache:
+        entries = cache.get('index.beancount', ledger.load_ledger)
+    else:
+        entries = ledger.load_ledger('index.beancount')[0]
+
+    wanted = set(accounts)
+    dates = {}
+    for entry in data.filter_txns(entries):
+        for posting in entry.postings:
+            if posting.account in wanted:
+                dates[posting.account] = entry.date
+    return dates
 
 
 @run.command()
 @click.argument('importer', type=click.Choice(list(IMPORTERS.keys())))
-def howto(importer: str) -> None:
+@click.pass_obj
+def howto(ctx: Ctx, importer: str) -> None:
     """Print howto guide for a specific account type."""
-    if not sh.which('bean-query'):
-        click.echo('Missing dependency bean-query.', err=True)
-        click.echo('Try `pipx install beanquery`.', err=True)
-        raise click.Abort()
-
-    query_cmd = sh.Command('bean-query')
-
-    def query(account: str) -> str:
-        # TODO: can LAST include balance statements?
-        expr = f'SELECT LAST(date) WHERE account="{account}"'
-        date: str = query_cmd('index.beancount', expr).splitlines()[-1]
-        return date
-
     try:
         config = Ctx.load_config()[importer]
     except KeyError as e:
@@ -231,8 +213,15 @@ def howto(importer: str) -> None:
         click.echo('ERROR: Malformed config (missing "account" key)')
         raise click.Abort() from e
 
+    dates = _last_dates(ctx.ledger_cache, accounts)
+
+    def query(account: str) -> str:
+        if account not in dates:
+            raise ValueError(f'no transactions found for {account}')
+        return str(dates[account])
+
     try:
-        lines = IMPORTERS[importer].howto(query, accounts)
+        lines = list(IMPORTERS[importer].howto(query, accounts))
     except Exception as e:
         click.echo(f'ERROR: {e}')
         raise click.Abort() from e
@@ -248,6 +237,8 @@ def howto(importer: str) -> None:
     click.echo(f'{i + 3}. bean-check index.beancount')
 
 
-run.add_command(beangulp._archive)  # pylint: disable=protected-access
-run.add_command(beangulp._extract)  # pylint: disable=protected-access
-run.add_command(beangulp._identify)  # pylint: disable=protected-access
+run.add_command(audit.patterns)
+run.add_command(daemon.serve)
+run.add_command(ingest.archive)
+run.add_command(ingest.extract)
+run.add_command(ingest.identify)
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import socket
+import sys
+from typing import Any
+
+
+# N.B. this module is imported by every bean-import-client invocation, so it
+# only imports from the standard library: the point is to skip loading
+# beancount and friends.
+
+# The default socket of bean-import serve, in the ledger folder.
+SOCKET = '.bean-import.sock'
+SOCKET_ENV = 'BEAN_IMPORT_SOCKET'
+
+# The commands bean-import serve runs, see daemon.COMMANDS.
+COMMANDS = ('archive', 'extract', 'identify')
+
+
+def send(f: io.BufferedIOBase, message: dict[str, Any]) -> None:
+    """Write one message of the protocol: a line of JSON."""
+    f.write(json.dumps(message).encode('utf-8') + b'\n')
+    f.flush()
+
+
+def connect(path: str) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def request(path: str, argv: list[str]) -> int | None:
+    """
+    Run a bean-import command through the daemon listening on path.
+
+    Its output is written out as it arrives. Returns its exit status, or None
+    if no daemon is listening there.
+    """
+    sock = connect(path)
+    if sock is None:
+        return None
+
+    with sock, sock.makefile('rwb') as f:
+        send(f, {
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'tty': [sys.stdout.isatty(), sys.stderr.isatty()],
+        })
+        for line in f:
+            message = json.loads(line)
+            if 'exit' in message:
+                return int(message['exit'])
+
+            stream = sys.stderr if message['stream'] == 'err' else sys.stdout
+            stream.write(message['text'])
+            stream.flush()
+
+    print('Error: lost connection to bean-import serve.', file=sys.stderr)
+    return 1
+
+
+def main() -> None:
+    """
+    Run a bean-import command through bean-import serve, if it is running.
+
+    Takes the same arguments as bean-import; the socket is found through the
+    BEAN_IMPORT_SOCKET environment variable, defaulting to that of a daemon
+    serving the current folder. Without a daemon, or for commands other than
+    those it serves, the command is run by bean-import instead.
+    """
+    argv = sys.argv[1:]
+    status = None
+    if argv and argv[0] in COMMANDS:
+        status = request(os.environ.get(SOCKET_ENV, SOCKET), argv)
+    if status is None:
+        os.execvp('bean-import', ['bean-import', *argv])
+    sys.exit(status)
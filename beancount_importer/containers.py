@@ -0,0 +1,93 @@
+import contextlib
+import io
+import mmap
+import os
+from collections.abc import Iterator
+from typing import BinaryIO
+from typing import NamedTuple
+
+
+class Container(NamedTuple):
+    """A wrapper some banks put around the statements they hand out."""
+    # leading bytes of a wrapped file
+    magic: bytes
+    # leading bytes of the statement inside of it
+    payload: bytes
+
+
+# eg. a PDF served as a serialized Java byte[]
+JAVA_SERIALIZED = Container(b'\xac\xed\x00\x05', b'%PDF-')
+
+
+class _Window(io.RawIOBase):
+    """A read-only file over the tail of a memory map, starting at offset."""
+
+    def __init__(self, buf: mmap.mmap, offset: int) -> None:
+        super().__init__()
+        # N.B. reads are copied straight out of the map through this view:
+        # slicing the map itself would copy each of them into a new bytes
+        self._view = memoryview(buf)[offset:]
+        self._pos = 0
+        self._size = len(self._view)
+
+    def close(self) -> None:
+        # N.B. the map can't be closed while a view of it is still around
+        self._view.release()
+        super().close()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, b: memoryview) -> int:  # type: ignore[override]
+        chunk = self._view[self._pos:self._pos + len(b)]
+        b[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+
+@contextlib.contextmanager
+def unwrap(
+        fname: str,
+        containers: tuple[Container, ...],
+) -> Iterator[BinaryIO]:
+    """
+    Open fname, skipping past any of containers wrapped around it.
+
+    Wrapped files are memory mapped, so finding the payload only touches the
+    pages before it and the statement is read straight out of the map, rather
+    than copying the whole file (twice) into memory.
+    """
+    with open(fname, 'rb') as f:
+        prefix = f.read(max((len(x.magic) for x in containers), default=0))
+        f.seek(0)
+
+        container = next(
+            (x for x in containers if prefix.startswith(x.magic)),
+            None,
+        )
+        if container is None:
+            yield f
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offset = buf.find(container.payload)
+            if offset == -1:
+                yield f
+                return
+
+            with io.BufferedReader(_Window(buf, offset)) as window:
+                yield window
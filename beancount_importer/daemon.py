@@ -0,0 +1,276 @@
+import codecs
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import time
+import traceback
+from collections.abc import Callable
+from typing import Any
+
+import beangulp.utils  # type: ignore[import-untyped]
+import click
+
+from . import ingest
+from .cache import file_key
+from .cache import FileKey
+from .cache import LedgerMemo
+from .client import send
+from .client import SOCKET
+from .client import SOCKET_ENV
+from .ingest import Context
+from .ledger import load_ledger
+from .manifest import Manifest
+
+
+# The commands run by bean-import serve, see Daemon.run(), and named as such
+# in client.COMMANDS.
+COMMANDS = {
+    'archive': ingest.archive,
+    'extract': ingest.extract,
+    'identify': ingest.identify,
+}
+
+# N.B. as read by Ctx.load_config()
+CONFIG = 'config.toml'
+
+
+class _Frames(io.RawIOBase):
+    """An output stream of a request, sent back to the client as written."""
+
+    def __init__(self, f: io.BufferedIOBase, stream: str, tty: bool) -> None:
+        super().__init__()
+        self.f = f
+        self.stream = stream
+        self.tty = tty
+        # N.B. buffered writes may split the bytes of a character
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    def isatty(self) -> bool:
+        # N.B. so that click keeps the colors the client's terminal would show
+        return self.tty
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        text = self._decoder.decode(bytes(b))
+        if text:
+            send(self.f, {'stream': self.stream, 'text': text})
+        return len(b)
+
+
+def _channel(f: io.BufferedIOBase, stream: str, tty: bool) -> io.TextIOWrapper:
+    raw = _Frames(f, stream, tty)
+    return io.TextIOWrapper(
+        io.BufferedWriter(raw, 2**16), encoding='utf-8', newline='\n',
+    )
+
+
+def _stamp(fname: str) -> FileKey | None:
+    try:
+        return file_key(fname)
+    except OSError:
+        return None
+
+
+def _status(code: Any) -> int:
+    # mirrors how the interpreter exits on sys.exit(code)
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    click.echo(code, err=True)
+    return 1
+
+
+class Daemon:
+    """
+    The state bean-import serve keeps warm between requests.
+
+    The importers (and the patterns they compile, and the statements they
+    parsed) are only rebuilt once config.toml changes, and the ledgers loaded
+    by extract -e are kept in memory until one of their files changes. The
+    manifest is reloaded once it changes, or after a run which failed before
+    saving it. Requests are run one at a time, from the folder the daemon was
+    started in.
+    """
+
+    def __init__(self, ctx: Context) -> None:
+        self.root = os.path.realpath(os.getcwd())
+        self.factory: Callable[[], Context] = type(ctx)
+        self.ledgers = LedgerMemo()
+        self.config = _stamp(CONFIG)
+        self._warm(ctx)
+
+    def _manifest(self) -> FileKey | None:
+        manifest = self.ctx.manifest
+        return _stamp(manifest.fname) if manifest else None
+
+    def _warm(self, ctx: Context) -> None:
+        self.ledgers.store = ctx.ledger_cache
+        ctx.ledger_cache = self.ledgers
+        self.ctx = ctx
+        self.manifest = self._manifest()
+        # set while a run may have left unsaved records in the manifest
+        self.dirty = False
+
+    def refresh(self) -> None:
+        """Reload what changed on disk, or a failed run left dirty."""
+        config = _stamp(CONFIG)
+        if config != self.config:
+            self._warm(self.factory())
+            self.config = config
+
+        # N.B. the importers' caches are kept: they are keyed by the size and
+        # mtime of each file, and hand out copies of what they hold
+        manifest = self.ctx.manifest
+        if manifest and (self.dirty or self._manifest() != self.manifest):
+            self.ctx.manifest = Manifest(manifest.fname)
+            self.manifest = self._manifest()
+            self.dirty = False
+
+    def run(self, argv: list[str]) -> int:
+        """Run a bean-import command, returning its exit status."""
+        try:
+            self.refresh()
+        except click.Abort:
+            # N.B. the config has been reported as invalid
+            return 1
+
+        command = COMMANDS.get(argv[0]) if argv else None
+        if command is None:
+            names = ', '.join(sorted(COMMANDS))
+            click.echo(f'Error: bean-import serve runs {names}.', err=True)
+            return 2
+
+        code = None
+        self.dirty = True
+        try:
+            # N.B. in standalone mode, click always ends with sys.exit()
+            command.main(
+                argv[1:], prog_name=f'bean-import {argv[0]}', obj=self.ctx,
+            )
+        except SystemExit as e:
+            code = e.code
+
+        status = _status(code)
+        if status == 0:
+            # N.B. the manifest is saved by every run which succeeds
+            self.manifest = self._manifest()
+            self.dirty = False
+        return status
+
+    def handle(self, f: io.BufferedIOBase) -> tuple[list[str], int]:
+        """Serve one request read from f, returning its command and status."""
+        request = json.loads(f.readline())
+        argv = [str(x) for x in request['argv']]
+        tty = request.get('tty') or [False, False]
+        out = _channel(f, 'out', bool(tty[0]))
+        err = _channel(f, 'err', bool(tty[1]))
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            if os.path.realpath(request['cwd']) != self.root:
+                click.echo(
+                    f'Error: bean-import serve runs in {self.root}, requests '
+                    'must be made from there.',
+                    err=True,
+                )
+                status = 2
+            else:
+                try:
+                    status = self.run(argv)
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+            out.flush()
+            err.flush()
+
+        send(f, {'exit': status})
+        return argv, status
+
+
+def _listen(path: str) -> socket.socket:
+    if os.path.exists(path):
+        # N.B. left behind by a daemon which wasn't shut down cleanly
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except ConnectionRefusedError:
+                os.unlink(path)
+            else:
+                raise click.ClickException(f'Already serving on {path}.')
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # N.B. requests can move files around, as their owner: the socket must be
+    # private from the moment it exists, not once it is chmod-ed
+    umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(umask)
+    sock.listen()
+    return sock
+
+
+def _serve(
+        daemon: Daemon,
+        sock: socket.socket,
+        log: Callable[..., None],
+) -> None:
+    while True:
+        conn, _ = sock.accept()
+        start = time.perf_counter()
+        with conn, conn.makefile('rwb') as f:
+            try:
+                argv, status = daemon.handle(f)
+            except (OSError, KeyError, ValueError) as e:
+                log(f'* request failed: {e!r}', fg='red')
+                continue
+
+        elapsed = time.perf_counter() - start
+        log(f'* {" ".join(argv)} ... exit {status} ({elapsed:.2f}s)')
+
+
+@click.command('serve')
+@click.option(
+    '--socket', 'path', metavar='PATH', default=SOCKET, envvar=SOCKET_ENV,
+    type=click.Path(dir_okay=False), show_default=True,
+    help='Unix domain socket to listen on.',
+)
+@click.option(
+    '--existing', '-e', type=click.Path(exists=True),
+    help='Existing Beancount ledger to load up front, for extract -e.',
+)
+@click.option('--quiet', '-q', count=True, help='Suppress all output.')
+@click.pass_obj
+def serve(
+        ctx: Context,
+        path: str,
+        existing: str | None,
+        quiet: int,
+) -> None:
+    """
+    Serve commands from a warm process.
+
+    Listen on a Unix domain socket for the identify, extract and archive
+    commands sent by bean-import-client, and run each of them as bean-import
+    would. The importers and ledgers are kept loaded between commands, and
+    only reloaded once config.toml or the ledger files change.
+    """
+    daemon = Daemon(ctx)
+    if existing:
+        daemon.ledgers.get(existing, load_ledger)
+
+    log = beangulp.utils.logger(-quiet, err=True)
+    with contextlib.ExitStack() as stack:
+        sock = stack.enter_context(_listen(path))
+        stack.callback(os.unlink, path)
+        log(f'Serving {daemon.root} on {path}')
+        # N.B. background jobs ignore SIGINT, so stop on kill as on ^C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            _serve(daemon, sock, log)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,98 @@
+import datetime
+import functools
+
+
+# Candidate formats, roughly ordered by how common they are in our exports.
+FORMATS = (
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%m/%d/%y',
+    '%d-%m-%Y',
+    '%b %d, %Y',
+    '%d %b %Y',
+    '%B %d, %Y',
+    '%d %B %Y',
+    '%Y%m%d',
+    '%Y-%m-%dT%H:%M:%S',
+)
+
+
+@functools.cache
+def _swapped(fmt: str) -> str | None:
+    """The month-first counterpart of a day-first format, if it is one."""
+    day, month = fmt.find('%d'), fmt.find('%m')
+    if day < 0 or month < 0 or day > month:
+        return None
+    return fmt.replace('%d', '\0').replace('%m', '%d').replace('\0', '%m')
+
+
+class DateParser:
+    """
+    Parse dates, sniffing their format from the first values seen.
+
+    Once we find a strptime format which agrees with dateutil, it is used for
+    every following value; only values which don't fit it fall back to
+    dateutil. Since dateutil reads ambiguous values (eg. 01/02) month-first, a
+    day-first format is only trusted for values which can't be read the other
+    way around: the rest still go through dateutil, so that every value
+    resolves as dateutil would, whatever the order of the rows. Results are
+    memoized, as statements repeat the same few dates many times.
+    """
+
+    # stop trying to sniff a format after this many failures
+    sniff_limit = 8
+
+    def __init__(
+            self,
+            formats: tuple[str, ...] = FORMATS,
+            *,
+            cache_size: int = 4096,
+    ) -> None:
+        self.format: str | None = None
+        self.formats = formats
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._parse)
+        self._sniffs = 0
+
+    def __call__(self, raw: str) -> datetime.datetime:
+        return self._cached(raw)
+
+    def _parse(self, raw: str) -> datetime.datetime:
+        # pylint: disable=import-outside-toplevel
+        if self.format:
+            try:
+                value = datetime.datetime.strptime(raw, self.format)
+            except ValueError:
+                pass
+            else:
+                if not self._ambiguous(raw, self.format):
+                    return value
+
+        import dateutil.parser
+        value = dateutil.parser.parse(raw)
+        if self.format is None and self._sniffs < self.sniff_limit:
+            self._sniffs += 1
+            self.format = self._sniff(raw, value)
+        return value
+
+    @staticmethod
+    def _ambiguous(raw: str, fmt: str) -> bool:
+        swapped = _swapped(fmt)
+        if swapped is None:
+            return False
+        try:
+            datetime.datetime.strptime(raw, swapped)
+        except ValueError:
+            return False
+        return True
+
+    def _sniff(self, raw: str, expected: datetime.datetime) -> str | None:
+        for fmt in self.formats:
+            try:
+                if datetime.datetime.strptime(raw, fmt) == expected:
+                    return fmt
+            except ValueError:
+                continue
+        return None
@@ -0,0 +1,209 @@
+import collections
+import datetime
+import decimal
+import functools
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+from beancount.core import data
+from beangulp.extract import DUPLICATE  # type: ignore[import-untyped]
+from beangulp.similar import amounts_map  # type: ignore[import-untyped]
+
+
+Key = tuple[data.Account, datetime.date, data.Currency, decimal.Decimal]
+Row = tuple[
+    datetime.date,
+    tuple[tuple[tuple[data.Account, data.Currency], decimal.Decimal], ...],
+    str,
+]
+
+
+@functools.lru_cache(maxsize=1024)
+def _postings(accounts: tuple[data.Account, ...]) -> list[data.Posting]:
+    # N.B. shared by every reference() to these accounts, never modified
+    return [data.Posting(x, None, None, None, None, None) for x in accounts]
+
+
+def reference(entry: data.Transaction) -> data.Transaction:
+    """
+    A stand-in for entry, keeping only what duplicates are found and shown by.
+
+    That is its metadata (where it came from) and the accounts of its
+    postings: indexes pointing to these rather than to the entries themselves
+    let the entries be dropped once they have been written out.
+    """
+    postings = _postings(tuple(x.account for x in entry.postings))
+    return data.Transaction(
+        entry.meta, entry.date, entry.flag, None, '', data.EMPTY_SET,
+        data.EMPTY_SET, postings,
+    )
+
+
+def _related(accounts: set[data.Account], other: data.Transaction) -> bool:
+    # as beangulp, the accounts of one are a subset of those of the other
+    others = {x.account for x in other.postings}
+    return accounts <= others or others <= accounts
+
+
+class Index:
+    """
+    Transactions, indexed by the (account, date, amount) of their postings.
+
+    beangulp compares every new entry to each existing one dated near it,
+    which gets slow with years of history. Here, finding the duplicates of a
+    transaction is a handful of dict lookups: one per posting and day in the
+    window. Candidates are then confirmed as beangulp does, by checking that
+    the accounts of one transaction are a subset of those of the other.
+
+    Unlike beangulp, amounts must match exactly rather than within 5%.
+    """
+
+    def __init__(self, entries: Iterable[data.Directive] = ()) -> None:
+        # each transaction along with the order it was added in
+        self._index: dict[Key, list[tuple[int, data.Transaction]]] = (
+            collections.defaultdict(list)
+        )
+        self._added = 0
+        self.add(entries)
+
+    def add(
+            self,
+            entries: Iterable[data.Directive],
+            targets: Sequence[data.Transaction] | None = None,
+    ) -> None:
+        """Index entries, pointing to targets (eg. references) if given."""
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, data.Transaction):
+                continue
+
+            target = entry if targets is None else targets[i]
+            self._added += 1
+            for (account, currency), number in amounts_map(entry).items():
+                key = (account, entry.date, currency, number)
+                self._index[key].append((self._added, target))
+
+    def find(
+            self,
+            entry: data.Directive,
+            window: int,
+    ) -> data.Transaction | None:
+        """
+        Find a transaction within window days which entry duplicates.
+
+        Of several, that is the one beangulp would point to: the last in date
+        order, and so the last added of those on the same day.
+        """
+        if not isinstance(entry, data.Transaction):
+            return None
+
+        accounts = {x.account for x in entry.postings}
+        amounts = amounts_map(entry).items()
+        for days in range(window, -window - 1, -1):
+            date = entry.date + datetime.timedelta(days=days)
+            latest, found = 0, None
+            for (account, currency), number in amounts:
+                key = (account, date, currency, number)
+                for added, target in reversed(self._index.get(key, [])):
+                    if added <= latest:
+                        break
+                    if _related(accounts, target):
+                        latest, found = added, target
+                        break
+            if found is not None:
+                return found
+
+        return None
+
+    def mark(
+            self,
+            entries: Iterable[data.Directive],
+            window: int,
+    ) -> list[tuple[data.Directive, data.Transaction]]:
+        """Mark duplicates as beangulp does, returning what was marked."""
+        marked = []
+        for entry in entries:
+            if DUPLICATE in entry.meta:
+                continue
+
+            target = self.find(entry, window)
+            if target is not None:
+                entry.meta[DUPLICATE] = target
+                marked.append((entry, target))
+        return marked
+
+
+def _describe(entry: data.Transaction) -> str:
+    text = ' '.join(x for x in (entry.payee, entry.narration) if x)
+    return ' '.join(text.split()).casefold()
+
+
+class Overlaps:
+    """
+    Transactions extracted so far in a run, by exact fingerprint.
+
+    Overlapping statements (eg. monthly downloads, or re-downloading "all
+    since last download") repeat the same rows verbatim. Each row is keyed by
+    its amounts, date and description plus its ordinal among identical rows
+    of its own file, so a file holding two identical coffees only overlaps
+    the first two such coffees of another file, never a third.
+    """
+
+    def __init__(self) -> None:
+        self._seen: dict[tuple[Row, int], data.Transaction] = {}
+
+    def mark(
+            self,
+            entries: Iterable[data.Transaction],
+            targets: Sequence[data.Transaction] | None = None,
+    ) -> list[data.Transaction]:
+        """
+        Mark entries overlapping those of earlier files, then add them.
+
+        Later files are marked as duplicates of targets (eg. references) if
+        given, rather than of the entries themselves.
+
+        Returns the entries with no identical row in any earlier file: the
+        others are settled, whether or not they were marked.
+        """
+        ordinals: collections.Counter[Row] = collections.Counter()
+        added = {}
+        unseen = []
+        for i, entry in enumerate(entries):
+            row: Row = (
+                entry.date,
+                tuple(sorted(amounts_map(entry).items())),
+                _describe(entry),
+            )
+            fingerprint = (row, ordinals[row])
+            ordinals[row] += 1
+
+            target = self._seen.get(fingerprint)
+            if target is not None:
+                entry.meta[DUPLICATE] = target
+                continue
+
+            added[fingerprint] = entry if targets is None else targets[i]
+            if (row, 0) not in self._seen:
+                unseen.append(entry)
+
+        self._seen.update(added)
+        return unseen
+
+
+def report(
+        fname: str,
+        entries: list[data.Transaction],
+        log: Callable[..., None],
+) -> None:
+    """Log the entries of fname marked as duplicates, and what of."""
+    duplicates = [x for x in entries if DUPLICATE in x.meta]
+    if not duplicates:
+        return
+
+    log(f'* {fname:} ... {len(duplicates)} duplicate(s)', fg='yellow')
+    for x in duplicates:
+        target = x.meta[DUPLICATE]
+        where = f'{target.meta.get("filename")}:{target.meta.get("lineno")}'
+        units = x.postings[0].units if x.postings else None
+        log(f'  {x.date} "{x.narration}" {units} (of {where})')
@@ -0,0 +1,128 @@
+import collections
+import os
+import re
+
+from beangulp.exceptions import Error  # type: ignore[import-untyped]
+
+from .patterns import fusable
+from .utils import Importer
+
+
+Marker = tuple[int, int]
+
+
+class _Alternatives:
+    """
+    Every fusable filename regex, as one anchored alternation.
+
+    As with patterns._FusedGroup, each alternative ends with an empty marker
+    group so `lastindex` identifies which one matched. To find every regex
+    matching a filename (rather than just the first), we keep one compiled
+    suffix of the alternation per position and retry from the next one along.
+    """
+
+    def __init__(self, sources: list[str]) -> None:
+        # for each suffix: marker group -> (alternative, its first group)
+        self.suffixes: list[tuple[re.Pattern[str], dict[int, Marker]]] = []
+        for start in range(len(sources)):
+            group = 0
+            markers: dict[int, Marker] = {}
+            alternatives: list[str] = []
+            for index in range(start, len(sources)):
+                alternatives.append(f'(?:{sources[index]})()')
+                first = group + 1
+                group += re.compile(sources[index]).groups + 1
+                markers[group] = (index, first)
+
+            self.suffixes.append((re.compile('|'.join(alternatives)), markers))
+
+    def match(self, basename: str) -> list[tuple[int, str | None]]:
+        """Find each matching alternative, with its first group if any."""
+        found: list[tuple[int, str | None]] = []
+        start = 0
+        while start < len(self.suffixes):
+            regex, markers = self.suffixes[start]
+            match = regex.match(basename)
+            if not match:
+                break
+
+            assert match.lastindex is not None
+            index, first = markers[match.lastindex]
+            key = match.group(first) if first < match.lastindex else None
+            found.append((index, key))
+            start = index + 1
+        return found
+
+
+class Dispatcher:
+    """
+    Resolve files to the importers which identify them.
+
+    Importer.identify() matches the basename against a per-class regex, then
+    checks the first group against the configured lastfour. Rather than doing
+    that for every importer, the distinct regexes are fused into a single
+    alternation and each is mapped to its importers by lastfour, so a file is
+    resolved to its candidates with a regex match and a dict lookup.
+
+    Importers which override identify() (or whose regex can not be fused) are
+    still asked directly; the result is identical either way.
+    """
+
+    def __init__(self, importers: list[Importer]) -> None:
+        self.importers = importers
+        self._fallback: list[int] = []
+
+        regexes: dict[re.Pattern[str], int] = {}
+        sources: list[str] = []
+        # alternative -> lastfour -> importers; lastfour None matches any
+        self._lastfour: list[dict[str | None, list[int]]] = []
+        for index, importer in enumerate(importers):
+            if type(importer).identify is not Importer.identify:
+                self._fallback.append(index)
+                continue
+
+            regex = importer._regex_fname  # pylint: disable=protected-access
+            if regex not in regexes:
+                source = fusable(regex)
+                if source is None:
+                    self._fallback.append(index)
+                    continue
+
+                regexes[regex] = len(sources)
+                sources.append(source)
+                self._lastfour.append(collections.defaultdict(list))
+
+            self._lastfour[regexes[regex]][importer.lastfour].append(index)
+
+        self._alternatives = _Alternatives(sources)
+
+    def candidates(self, fname: str) -> list[Importer]:
+        """Find every importer which identifies fname, in config order."""
+        indexes = [
+            i for i in self._fallback if self.importers[i].identify(fname)
+        ]
+        for alternative, key in self._alternatives.match(
+                os.path.basename(fname),
+        ):
+            lastfour = self._lastfour[alternative]
+            indexes.extend(lastfour.get(None, []))
+            if key is not None:
+                indexes.extend(lastfour.get(key, []))
+
+        return [self.importers[i] for i in sorted(indexes)]
+
+    def identify(self, fname: str) -> Importer | None:
+        """
+        Find the importer for fname, as beangulp.identify.identify().
+
+        Raises:
+          beangulp.exceptions.Error: More than one importer matched the file.
+        """
+        match = self.candidates(fname)
+        if len(match) > 1:
+            names = [f'  {x.name}' for x in match]
+            raise Error(
+                'Document identified by more than one importer.', *names,
+            )
+
+        return match[0] if match else None
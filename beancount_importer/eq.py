@@ -1,13 +1,13 @@
 import re
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 from typing import cast
 
-import py_pdf_parser.loaders
-import py_pdf_parser.tables
 from beancount.core import data
-from dateutil.parser import parse
 
+from .schema import resolve
+from .schema import Row
 from .utils import Importer
 
 
@@ -15,18 +15,18 @@ class EqImporter(Importer):
     _default_currency = 'CAD'
     _regex_fname = re.compile(r'(\d+) .* Statement.pdf')
 
-    def _parse_amount(self, row: dict[str, Any]) -> str:
+    def _parse_amount(self, row: Mapping[str, Any]) -> str:
         if row.get('Withdrawals'):
             return f'-{row["Withdrawals"].strip("- $")}'
         return cast(str, row['Deposits'].strip('$'))
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction:
         # TODO: get year from filename?
-        date = parse(row['Date']).date()
+        date = self._date(row['Date'])
         # TODO: parse out payee vs narration?
         narration = row['Description']
         amt = self._amount(self._parse_amount(row))
@@ -41,11 +41,15 @@ class EqImporter(Importer):
         )
 
     def _extract(self, fname: str) -> Iterator[data.Transaction]:
-        doc = py_pdf_parser.loaders.load_file(fname)
+        # pylint: disable=import-outside-toplevel
+        import py_pdf_parser.tables
 
-        header = doc.elements.filter_by_text_equal('Activity details')[-1]
-        footer = doc.elements.filter_by_text_contains('Equitable Bank Towe')[0]
-        body = doc.elements.between(header, footer)
+        from .pdf import load_between
+
+        with open(fname, 'rb') as f:
+            body = load_between(
+                f, 'Activity details', 'Equitable Bank Towe', fname=fname,
+            )
 
         table = py_pdf_parser.tables.extract_table(
             body,
@@ -54,7 +58,10 @@ class EqImporter(Importer):
             as_text=True,
         )
 
-        rows = [dict(zip(table[0], x)) for x in table[1:]]
-        for index, row in enumerate(rows):
+        if not table:
+            return
+
+        columns = resolve(self._schemas, table[0])
+        for index, values in enumerate(table[1:]):
             meta = data.new_metadata(fname, index)
-            yield self._extract_from_row(row, meta)
+            yield self._extract_from_row(Row(columns, values), meta)
@@ -0,0 +1,390 @@
+import datetime
+import os
+import sys
+from collections.abc import Callable
+from typing import Any
+from typing import Protocol
+from typing import TextIO
+
+import beangulp.archive  # type: ignore[import-untyped]
+import beangulp.exceptions  # type: ignore[import-untyped]
+import beangulp.extract  # type: ignore[import-untyped]
+import beangulp.utils  # type: ignore[import-untyped]
+import click
+from beancount.core import data
+
+from .cache import LedgerCache
+from .dispatch import Dispatcher
+from .ledger import load_existing
+from .manifest import Manifest
+from .profiling import measure
+from .profiling import profile_dir_option
+from .profiling import profile_option
+from .profiling import profiling
+from .utils import Importer
+from .workers import handle
+from .workers import jobs_option
+from .workers import process
+from .workers import Result
+from .writer import Extracted
+from .writer import Writer
+
+
+class Context(Protocol):
+    dispatcher: Dispatcher
+    importers: list[Importer]
+    hooks: list[Any]
+    ledger_cache: LedgerCache | None
+    manifest: Manifest | None
+
+
+def _extract_file(fname: str) -> Result:
+    # N.B. none of our importers make use of the existing entries
+    return handle(
+        fname,
+        lambda importer, x: beangulp.extract.extract_from_file(
+            importer, x, [],
+        ),
+    )
+
+
+def _iter_extract(importer: Importer, fname: str) -> list[data.Transaction]:
+    # mirrors beangulp.extract.extract_from_file(), without the importer's
+    # cache of recently extracted files
+    entries = list(importer.iter_extract(fname))
+    importer.sort(entries)
+    for entry in entries:
+        data.sanity_check_types(entry)
+    return entries
+
+
+def _stream_file(fname: str) -> Result:
+    return handle(fname, _iter_extract)
+
+
+def _identify_file(fname: str) -> Result:
+    return handle(fname, lambda importer, x: None)
+
+
+def _archive(
+        importer: Importer,
+        fname: str,
+) -> tuple[str, list[datetime.date]]:
+    path = beangulp.archive.filepath(importer, fname)
+    # N.B. the importer has just extracted fname to date it, so this is free;
+    # only the dates are sent back, for the manifest
+    return path, [x.date for x in importer.extract(fname, [])]
+
+
+def _archive_file(fname: str) -> Result:
+    return handle(fname, _archive)
+
+
+def _done(
+        ctx: Context,
+        command: str | None,
+        force: bool,
+) -> Callable[[str], bool] | None:
+    manifest = ctx.manifest
+    if manifest is None or force:
+        return None
+    return lambda fname: manifest.done(fname, command)
+
+
+def _accept(result: Result, log: Callable[..., None]) -> int | None:
+    """Log progress for a result, returning its importer if it is usable."""
+    log(f'* {result.fname:}', nl=False)
+    if result.done:
+        log(' ... SKIP (already processed)')
+        return None
+    if result.skipped:
+        log(' ... SKIP')
+        return None
+
+    if result.importer is not None:
+        log(' ...', nl=False)
+    if result.error:
+        raise beangulp.exceptions.Error(result.error)
+    if result.importer is None:
+        log('')  # Newline.
+
+    return result.importer
+
+
+force_option = click.option(
+    '--force', is_flag=True,
+    help='Also process files the manifest records as already processed.',
+)
+
+
+@click.command('extract')
+@click.argument(
+    'src', nargs=-1, type=click.Path(exists=True, resolve_path=True),
+)
+@click.option(
+    '--output', '-o', type=click.File('w'), default='-',
+    help='Output file.',
+)
+@click.option(
+    '--existing', '-e', type=click.Path(exists=True),
+    help='Existing Beancount ledger for de-duplication.',
+)
+@click.option(
+    '--reverse', '-r', is_flag=True,
+    help='Sort entries in reverse order.',
+)
+@click.option(
+    '--failfast', '-x', is_flag=True,
+    help='Stop processing at the first error.',
+)
+@click.option('--quiet', '-q', count=True, help='Suppress all output.')
+@click.option(
+    '--stream', is_flag=True,
+    help=(
+        'Write out the entries of each file as soon as it is processed, '
+        'keeping memory use bounded. Files are written in the order they are '
+        'found rather than sorted.'
+    ),
+)
+@profile_option
+@profile_dir_option
+@jobs_option
+@force_option
+@click.pass_obj
+def extract(
+        ctx: Context,
+        src: tuple[str, ...],
+        output: TextIO,
+        existing: str | None,
+        reverse: bool,
+        failfast: bool,
+        quiet: int,
+        profile: bool,
+        profile_dir: str | None,
+        jobs: int,
+        force: bool,
+        stream: bool,
+) -> None:
+    """
+    Extract transactions from documents.
+
+    Walk the SRC list of files or directories and extract the ledger entries
+    from each file identified by one of the configured importers. The entries
+    are written to the specified output file or to the standard output in
+    Beancount ledger format in sections associated to the source document.
+    """
+    # pylint: disable=too-complex,too-many-locals,too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    _ = reverse  # N.B. unused by beangulp as well
+    log = beangulp.utils.logger(-quiet, err=True)
+    errors = beangulp.exceptions.ExceptionsTrap(log)
+    profiler = click.get_current_context().with_resource(
+        profiling(ctx.importers, profile, profile_dir, sys.stderr),
+    )
+    if profiler:
+        # N.B. stages can only be measured in this process
+        jobs = 1
+
+    existing_entries = measure(
+        profiler, 'ledger',
+        lambda: load_existing(ctx.ledger_cache, existing), fname=existing,
+    )
+
+    writer = Writer(ctx, existing_entries, output, log, profiler, stream)
+    extracted: list[Extracted] = []
+    fnames = beangulp.utils.walk(src)
+    done = _done(ctx, 'extract', force)
+    func = _stream_file if stream else _extract_file
+    for result in process(ctx, func, fnames, jobs, done):
+        with errors:
+            index = _accept(result, log)
+            if index is None:
+                continue
+
+            importer = ctx.importers[index]
+            account = importer.account(result.fname)
+            extracted.append((result.fname, result.value, account, importer))
+            log(' OK', fg='green')
+
+        if stream and extracted:
+            writer.deduplicate(extracted[0])
+            writer.write(extracted)
+            # N.B. drop this file before reading the next one
+            extracted = []
+            del result
+        if failfast and errors:
+            break
+
+    if not stream:
+        beangulp.extract.sort_extracted_entries(extracted)
+        for x in extracted:
+            writer.deduplicate(x)
+        writer.write(extracted)
+
+    if errors:
+        sys.exit(1)
+    if ctx.manifest:
+        ctx.manifest.save()
+
+
+@click.command('archive')
+@click.argument(
+    'src', nargs=-1, type=click.Path(exists=True, resolve_path=True),
+)
+@click.option(
+    '--destination', '-o', metavar='DIR',
+    type=click.Path(exists=True, file_okay=False, resolve_path=True),
+    help='The destination documents tree root directory.',
+)
+@click.option(
+    '--overwrite', '-f', is_flag=True,
+    help='Overwrite destination files with the same name.',
+)
+@click.option(
+    '--dry-run', '-n', is_flag=True,
+    help='Just print where the files would be moved.',
+)
+@click.option(
+    '--failfast', '-x', is_flag=True,
+    help='Stop processing at the first error.',
+)
+@click.option('--quiet', '-q', count=True, help='Suppress all output.')
+@jobs_option
+@force_option
+@click.pass_obj
+def archive(
+        ctx: Context,
+        src: tuple[str, ...],
+        destination: str | None,
+        dry_run: bool,
+        overwrite: bool,
+        failfast: bool,
+        quiet: int,
+        jobs: int,
+        force: bool,
+) -> None:
+    """
+    Archive documents.
+
+    Walk the SRC list of files or directories and move each file identified by
+    one of the configured importers in a directory hierarchy mirroring the
+    structure of the accounts associated to the documents and with a file name
+    composed by the document date and document name returned by the importer.
+
+    Documents are moved to their filing location only when no errors are
+    encountered processing all the input files. Documents in the destination
+    directory are not overwritten, unless the --overwrite option is used. When
+    the directory hierarchy root is not specified with the --destination DIR
+    option, it is assumed to be directory in which the ingest script is
+    located.
+    """
+    # pylint: disable=too-complex,too-many-locals
+    if destination is None:
+        main = getattr(sys.modules['__main__'], '__file__', None) or ''
+        destination = os.path.dirname(os.path.abspath(main))
+
+    log = beangulp.utils.logger(-quiet, err=True)
+    errors = beangulp.exceptions.ExceptionsTrap(log)
+    renames: list[tuple[str, str]] = []
+    archived: list[tuple[str, Importer, list[datetime.date]]] = []
+
+    fnames = beangulp.utils.walk(src)
+    done = _done(ctx, 'archive', force)
+    for result in process(ctx, _archive_file, fnames, jobs, done):
+        with errors:
+            index = _accept(result, log)
+            if index is None:
+                continue
+
+            path, dates = result.value
+            destpath = os.path.join(destination, path)
+            if any(dst == destpath for _, dst in renames):
+                raise beangulp.exceptions.Error(
+                    'Collision in destination file path.', destpath,
+                )
+            if not overwrite and os.path.exists(destpath):
+                raise beangulp.exceptions.Error(
+                    'Destination file already exists.', destpath,
+                )
+
+            renames.append((result.fname, destpath))
+            archived.append((result.fname, ctx.importers[index], dates))
+            log(' OK', fg='green')
+            log(f'  {destpath:}')
+
+        if failfast and errors:
+            break
+
+    if errors:
+        log('# Errors detected: documents will not be filed.')
+        sys.exit(1)
+
+    if dry_run:
+        return
+
+    # N.B. files are keyed by their contents, which must be read before the
+    # file is moved away
+    if ctx.manifest:
+        for fname, importer, dates in archived:
+            ctx.manifest.record(
+                fname, 'archive', importer.name, importer.account(fname),
+                dates,
+            )
+    for fname, destpath in renames:
+        beangulp.archive.move(fname, destpath)
+    if ctx.manifest:
+        ctx.manifest.save()
+
+
+@click.command('identify')
+@click.argument(
+    'src', nargs=-1, type=click.Path(exists=True, resolve_path=True),
+)
+@click.option(
+    '--failfast', '-x', is_flag=True,
+    help='Stop processing at the first error.',
+)
+@click.option(
+    '--verbose', '-v', is_flag=True,
+    help='Show account information.',
+)
+@force_option
+@click.pass_obj
+def identify(
+        ctx: Context,
+        src: tuple[str, ...],
+        failfast: bool,
+        verbose: bool,
+        force: bool,
+) -> None:
+    """
+    Identify files for import.
+
+    Walk the SRC list of files or directories and report each file identified
+    by one of the configured importers. When verbose output is requested, also
+    print the account name associated to the document by the importer.
+    """
+    log = beangulp.utils.logger(verbose)
+    errors = beangulp.exceptions.ExceptionsTrap(log)
+
+    # N.B. identifying is cheap: files are only skipped once they have been
+    # extracted or archived
+    fnames = beangulp.utils.walk(src)
+    done = _done(ctx, None, force)
+    for result in process(ctx, _identify_file, fnames, 1, done):
+        with errors:
+            index = _accept(result, log)
+            if index is None:
+                continue
+
+            importer = ctx.importers[index]
+            account = importer.account(result.fname) if verbose else None
+            log(' OK', fg='green')
+            log(f'  {importer.name:}')
+            log(f'  {account:}', 1)
+
+        if failfast and errors:
+            break
+
+    if errors:
+        sys.exit(1)
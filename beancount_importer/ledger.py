@@ -0,0 +1,39 @@
+import importlib.util
+import os
+from typing import Any
+
+from beancount import loader
+from beancount.core import data
+
+from .cache import LedgerCache
+
+
+def _plugin_sources(options: dict[str, Any]) -> list[str]:
+    # N.B. beancount's own plugins change along with its version
+    sources = []
+    for name, _config in options['plugin']:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            continue
+        if spec and spec.origin and os.path.isfile(spec.origin):
+            sources.append(spec.origin)
+    return sources
+
+
+def load_ledger(fname: str) -> tuple[list[data.Directive], list[str]]:
+    """Load a ledger, and the files it depends on (includes, plugins)."""
+    entries, _errors, options = loader.load_file(fname)
+    return entries, [*options['include'], *_plugin_sources(options)]
+
+
+def load_existing(
+        cache: LedgerCache | None,
+        existing: str | None,
+) -> list[data.Directive]:
+    """Load the existing ledger, if any, through cache if there is one."""
+    if existing and cache:
+        return cache.get(existing, load_ledger)
+    if existing:
+        return load_ledger(existing)[0]
+    return []
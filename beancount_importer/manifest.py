@@ -0,0 +1,71 @@
+import datetime
+import json
+import os
+from collections.abc import Iterable
+from typing import Any
+
+from .cache import file_digest
+
+
+class Manifest:
+    """
+    The statements each command has already handled, by content hash.
+
+    Records are kept in a JSON file alongside the path, size and mtime each
+    hash was last computed for, so telling whether an unchanged file was
+    already handled only needs a stat. A statement which is re-downloaded
+    under another name is still recognized, by its hash.
+    """
+
+    def __init__(self, fname: str) -> None:
+        self.fname = fname
+        try:
+            with open(fname, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        self._stats: dict[str, list[Any]] = state.get('stats', {})
+        self._files: dict[str, dict[str, Any]] = state.get('files', {})
+
+    def key(self, fname: str) -> str:
+        fname = os.path.realpath(fname)
+        stat = os.stat(fname)
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        cached = self._stats.get(fname)
+        if cached and cached[:2] == stamp:
+            return str(cached[2])
+
+        key = file_digest(fname)
+        self._stats[fname] = [*stamp, key]
+        return key
+
+    def done(self, fname: str, command: str | None = None) -> bool:
+        """Check whether command (or, by default, any) has handled fname."""
+        records = self._files.get(self.key(fname), {})
+        return bool(records) if command is None else command in records
+
+    def record(
+            self,
+            fname: str,
+            command: str,
+            importer: str,
+            account: str,
+            dates: Iterable[datetime.date] = (),
+    ) -> None:
+        """Record that command handled fname, and the dates of its rows."""
+        dates = sorted(dates)
+        self._files.setdefault(self.key(fname), {})[command] = {
+            'importer': importer,
+            'account': account,
+            'rows': len(dates),
+            'first': dates[0].isoformat() if dates else None,
+            'last': dates[-1].isoformat() if dates else None,
+        }
+
+    def save(self) -> None:
+        # N.B. forget the stats of files which have since been moved
+        stats = {k: v for k, v in self._stats.items() if os.path.exists(k)}
+        tmp = f'{self.fname}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'stats': stats, 'files': self._files}, f, indent=1)
+        os.replace(tmp, self.fname)
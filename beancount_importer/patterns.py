@@ -0,0 +1,247 @@
+import enum
+import functools
+import re
+from collections.abc import Iterator
+from typing import Self
+
+from beancount.core import data
+
+
+class AccountPatternTarget(str, enum.Enum):
+    BOTH = 'both'
+    EITHER = 'either'
+    NARRATION = 'narration'
+    PAYEE = 'payee'
+
+
+class AccountPattern:
+    def __init__(
+            self,
+            account: data.Account,
+            pattern: str,
+            *,
+            flag: data.Flag | None = None,
+            target: AccountPatternTarget = AccountPatternTarget.EITHER,
+    ) -> None:
+        self.account = account
+        self.flag = flag
+        self.pattern = re.compile(pattern)
+        self.target = target
+
+    @classmethod
+    def from_config(cls, raw: list[str]) -> Self:
+        kind, account, pattern, *extra = raw
+        target = AccountPatternTarget(kind)
+        flag = extra[0] if extra else None
+        return cls(account, pattern, flag=flag, target=target)
+
+    def __repr__(self) -> str:
+        return (
+            f'AccountPattern({self.account}, {self.pattern}, {self.flag}, '
+            f'{self.target}'
+        )
+
+    def matches(self, tx: data.Transaction) -> bool:
+        return self.matches_text(tx.payee, tx.narration)
+
+    def matches_text(self, payee: str | None, narration: str | None) -> bool:
+        if self.target == AccountPatternTarget.NARRATION and narration:
+            return bool(self.pattern.search(narration))
+        if self.target == AccountPatternTarget.PAYEE and payee:
+            return bool(self.pattern.search(payee))
+        if self.target == AccountPatternTarget.BOTH:
+            return bool(
+                self.pattern.search(f'{payee or ""};{narration or ""}'),
+            )
+        if self.target == AccountPatternTarget.EITHER:
+            if narration and self.pattern.search(narration):
+                return True
+            if payee and self.pattern.search(payee):
+                return True
+
+        return False
+
+    def posting(self, tx: data.Transaction) -> data.Posting:
+        # TODO: should be inferable somehow if null?
+        assert tx.postings[0].units
+
+        amt = -tx.postings[0].units
+        return data.Posting(self.account, amt, None, None, self.flag, None)
+
+
+def _targets(
+        target: AccountPatternTarget,
+        payee: str | None,
+        narration: str | None,
+) -> Iterator[str]:
+    # The strings AccountPattern.matches_text() searches for a given target.
+    if target == AccountPatternTarget.NARRATION:
+        if narration:
+            yield narration
+    elif target == AccountPatternTarget.PAYEE:
+        if payee:
+            yield payee
+    elif target == AccountPatternTarget.BOTH:
+        yield f'{payee or ""};{narration or ""}'
+    else:
+        if narration:
+            yield narration
+        if payee:
+            yield payee
+
+
+# Global inline flags must be rewritten into scoped ones to be fused. We skip
+# verbose mode, since a trailing comment would swallow whatever follows it.
+_regex_flags = re.compile(r'^\(\?([aiLmsu]+)\)')
+# Backreferences would be renumbered and named groups may collide. This is
+# conservative (eg. r'\\1' is skipped too), which is harmless.
+_regex_unfusable = re.compile(r'\\[1-9]|\(\?P[<=]|\(\?\(')
+_scoped_flags = {
+    re.ASCII: 'a',
+    re.IGNORECASE: 'i',
+    re.MULTILINE: 'm',
+    re.DOTALL: 's',
+}
+
+
+def fusable(pattern: re.Pattern[str]) -> str | None:
+    """
+    Rewrite pattern so it can be one alternative of a larger regex.
+
+    Returns None if that can't be done without changing its meaning.
+    """
+    source = pattern.pattern
+    if _regex_unfusable.search(source):
+        return None
+
+    while match := _regex_flags.match(source):
+        source = source[match.end():]
+    if re.compile(source).flags != re.UNICODE:
+        return None
+
+    # N.B. pattern.flags covers both the stripped inline flags and any passed
+    # to re.compile()
+    flags = pattern.flags & ~re.UNICODE
+    letters = ''.join(v for k, v in _scoped_flags.items() if flags & k)
+    if flags & ~sum(_scoped_flags):
+        return None
+
+    return f'(?{letters}:{source})' if letters else source
+
+
+class _FusedGroup:
+    """
+    A single alternation of every fusable pattern sharing one target.
+
+    Each alternative ends with an empty marker group; since it is the last
+    group to close, `lastindex` identifies the alternative which matched.
+    Keeping the marker at the end (rather than wrapping each pattern) means
+    alternatives starting with a literal are still cheaply rejected by sre.
+    """
+
+    def __init__(self, indexes: list[int], sources: list[str]) -> None:
+        self.indexes = indexes
+        self.group_to_index: dict[int, int] = {}
+
+        group = 0
+        alternatives: list[str] = []
+        for index, source in zip(indexes, sources):
+            alternatives.append(f'(?:{source})()')
+            group += re.compile(source).groups + 1
+            self.group_to_index[group] = index
+
+        self.regex = re.compile('|'.join(alternatives))
+
+    def search(self, xs: Iterator[str]) -> int | None:
+        """
+        Find the lowest index of any pattern matching any of xs.
+
+        At the leftmost matching position, sre tries alternatives in order, so
+        any earlier pattern can only match further along: we keep searching
+        from the next position until we run out of string or can't do better.
+        """
+        best: int | None = None
+        for x in xs:
+            pos = 0
+            while match := self.regex.search(x, pos):
+                assert match.lastindex is not None
+                index = self.group_to_index[match.lastindex]
+                if best is None or index < best:
+                    best = index
+                    if best == self.indexes[0]:
+                        return best
+
+                pos = match.start() + 1
+                if pos > len(x):
+                    break
+        return best
+
+
+class PatternMatcher:
+    """
+    Find the first AccountPattern matching a transaction.
+
+    Patterns are grouped by target and fused into one alternation per group,
+    each of which finds its lowest matching index in a single scan. The few
+    patterns which can not be fused are checked one at a time, but only if they
+    come before the best fused match. This gives exactly the same answer as
+    checking every pattern in order.
+
+    Since statements repeat the same merchants over and over, results
+    (including misses) are memoized per (payee, narration) in a bounded LRU;
+    see cache_info() for its hit rate.
+    """
+
+    def __init__(
+            self,
+            patterns: list[AccountPattern],
+            *,
+            cache_size: int = 4096,
+    ) -> None:
+        self.patterns = patterns
+        self._lookup = functools.lru_cache(maxsize=cache_size)(self._search)
+
+        fused: dict[AccountPatternTarget, tuple[list[int], list[str]]] = {}
+        self._unfused: list[int] = []
+        for index, pattern in enumerate(patterns):
+            source = fusable(pattern.pattern)
+            if source is None:
+                self._unfused.append(index)
+                continue
+
+            indexes, sources = fused.setdefault(pattern.target, ([], []))
+            indexes.append(index)
+            sources.append(source)
+
+        self._groups: dict[AccountPatternTarget, _FusedGroup] = {}
+        for target, (indexes, sources) in fused.items():
+            try:
+                self._groups[target] = _FusedGroup(indexes, sources)
+            except re.error:
+                self._unfused.extend(indexes)
+        self._unfused.sort()
+
+    def match(self, tx: data.Transaction) -> AccountPattern | None:
+        index = self.index(tx)
+        return None if index is None else self.patterns[index]
+
+    def cache_info(self) -> functools._CacheInfo:
+        return self._lookup.cache_info()
+
+    def index(self, tx: data.Transaction) -> int | None:
+        return self._lookup(tx.payee, tx.narration)
+
+    def _search(self, payee: str | None, narration: str | None) -> int | None:
+        bound = len(self.patterns)
+        for target, group in self._groups.items():
+            hit = group.search(_targets(target, payee, narration))
+            if hit is not None:
+                bound = min(bound, hit)
+
+        for index in self._unfused:
+            if index >= bound:
+                break
+            if self.patterns[index].matches_text(payee, narration):
+                return index
+
+        return bound if bound < len(self.patterns) else None
@@ -3,15 +3,14 @@ import datetime
 import re
 from collections.abc import Iterable
 from collections.abc import Iterator
-from typing import Any
 from typing import cast
 
-import titlecase
 from beancount.core import amount
 from beancount.core import data
 from beancount.core.number import D
-from dateutil.parser import parse
 
+from .schema import resolve
+from .schema import Row
 from .utils import Importer
 
 
@@ -26,26 +25,22 @@ class PaypalImporter(Importer):
     # pylint: disable=abstract-method
     _regex_fname = re.compile(r'Download.CSV')
 
-    @staticmethod
-    def _get_date(row: dict[str, Any]) -> str:
-        # TODO: wtf
-        value: str | None = row.get('\ufeff"Date"')
-        if value is not None:
-            return value
-        return cast(str, row['Date'])
-
     def _extractz(self, fname: str) -> Iterator[MetaTuple]:
-        with open(fname, encoding='utf-8') as f:
-            for index, row in enumerate(csv.DictReader(f)):
+        # N.B. utf-8-sig strips the byte order mark from the "Date" header
+        with open(fname, encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            index = resolve(self._schemas, next(reader, []))
+            for lineno, values in enumerate(x for x in reader if x):
+                row = Row(index, values)
                 if row['Status'] != 'Completed':
                     continue
 
-                date = parse(self._get_date(row)).date()
-                kind = titlecase.titlecase(row['Type'])
-                name = titlecase.titlecase(row['Name'])
+                date = self._date(row['Date'])
+                kind = self._case(row['Type'])
+                name = self._case(row['Name'])
                 amt = amount.Amount(D(row['Amount']), row['Currency'])
 
-                meta = data.new_metadata(fname, index)
+                meta = data.new_metadata(fname, lineno)
                 yield cast(MetaTuple, (date, meta, name, kind, amt))
 
         # TODO: append data.Balance() record
@@ -141,9 +136,9 @@ class PaypalImporter(Importer):
                 postings=postings,
             )
 
-    def extract(
-            self,
-            fname: str,
-            _existing: list[data.Transaction],
-    ) -> list[data.Transaction]:
-        return list(self._merge(self._group(self._extractz(fname))))
+    def _extract(self, fname: str) -> Iterator[data.Transaction]:
+        return self._merge(self._group(self._extractz(fname)))
+
+    def _add_posting(self, x: data.Transaction) -> data.Transaction:
+        # TODO: integrate with account_patterns, see _consolidate_conversions
+        return x
@@ -0,0 +1,173 @@
+import re
+from collections.abc import Collection
+from typing import BinaryIO
+
+import py_pdf_parser.components
+import py_pdf_parser.filtering
+import py_pdf_parser.loaders
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams
+from pdfminer.layout import LTTextBox
+from pdfminer.pdfcolor import PDFColorSpace
+from pdfminer.pdfdevice import PDFDevice
+from pdfminer.pdfdevice import PDFTextSeq
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFGraphicState
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdfinterp import PDFResourceManager
+from pdfminer.pdfinterp import PDFTextState
+from pdfminer.pdfpage import PDFPage
+from pdfminer.utils import Matrix
+
+
+# N.B. this module is slow to import, since it pulls in pdfminer: importers
+# should only load it when they need it.
+
+
+_regex_space = re.compile(r'\s+')
+
+
+def _squash(text: str) -> str:
+    # layout analysis may add or drop spaces between words
+    return _regex_space.sub('', text)
+
+
+class _TextDevice(PDFDevice):
+    """
+    Collect the text of each page, in content stream order.
+
+    Unlike pdfminer's layout devices, this skips building (and then grouping)
+    positioned objects for every character, which is most of the work.
+    """
+
+    def __init__(self, manager: PDFResourceManager) -> None:
+        super().__init__(manager)
+        self.pages: list[str] = []
+        self._chunks: list[str] = []
+
+    def begin_page(self, page: PDFPage, ctm: Matrix) -> None:
+        self._chunks = []
+
+    def end_page(self, page: PDFPage) -> None:
+        self.pages.append(_squash(''.join(self._chunks)))
+
+    def render_string(
+            self,
+            textstate: PDFTextState,
+            seq: PDFTextSeq,
+            ncs: PDFColorSpace,
+            graphicstate: PDFGraphicState,
+    ) -> None:
+        font = textstate.font
+        if font is None:
+            return
+
+        for x in seq:
+            if not isinstance(x, bytes):
+                continue
+
+            for cid in font.decode(x):
+                try:
+                    self._chunks.append(font.to_unichr(cid))
+                except PDFUnicodeNotDefined:
+                    # N.B. pdfminer would render this as '(cid:N)'
+                    continue
+
+
+def _scan(f: BinaryIO) -> list[str]:
+    manager = PDFResourceManager()
+    device = _TextDevice(manager)
+    interpreter = PDFPageInterpreter(manager, device)
+    for page in PDFPage.get_pages(f):
+        interpreter.process_page(page)
+    return device.pages
+
+
+def _section(texts: list[str], start: str, end: str) -> range | None:
+    """
+    Find the pages from the last mentioning start to the first mentioning end.
+
+    If end is first mentioned before start, the section would be empty: we
+    return None so as to fall back to the full document.
+    """
+    start, end = _squash(start), _squash(end)
+    first = next(
+        (i for i in reversed(range(len(texts))) if start in texts[i]),
+        None,
+    )
+    last = next((i for i, x in enumerate(texts) if end in x), None)
+    if first is None or last is None or last < first:
+        return None
+
+    return range(first, last + 1)
+
+
+def _load(
+        f: BinaryIO,
+        indexes: Collection[int] | None,
+        fname: str | None,
+) -> py_pdf_parser.components.PDFDocument:
+    # mirrors py_pdf_parser.loaders.load(), for a subset of the pages
+    laparams = LAParams(**py_pdf_parser.loaders.DEFAULT_LA_PARAMS)
+    manager = PDFResourceManager()
+    device = PDFPageAggregator(manager, laparams=laparams)
+    interpreter = PDFPageInterpreter(manager, device)
+
+    f.seek(0)
+    pages: dict[int, py_pdf_parser.loaders.Page] = {}
+    for index, page in enumerate(PDFPage.get_pages(f)):
+        if indexes is not None and index not in indexes:
+            continue
+
+        # N.B. keep page numbers as they are in the full document
+        device.pageno = index + 1
+        interpreter.process_page(page)
+        layout = device.get_result()
+
+        elements = [x for x in layout if isinstance(x, LTTextBox)]
+        if not elements:
+            continue
+
+        pages[layout.pageid] = py_pdf_parser.loaders.Page(
+            width=layout.width, height=layout.height, elements=elements,
+        )
+
+    return py_pdf_parser.components.PDFDocument(
+        pages=pages, pdf_file_path=fname,
+    )
+
+
+def _between(
+        doc: py_pdf_parser.components.PDFDocument,
+        start: str,
+        end: str,
+) -> py_pdf_parser.filtering.ElementList:
+    header = doc.elements.filter_by_text_equal(start)[-1]
+    footer = doc.elements.filter_by_text_contains(end)[0]
+    return doc.elements.between(header, footer)
+
+
+def load_between(
+        f: BinaryIO,
+        start: str,
+        end: str,
+        *,
+        fname: str | None = None,
+) -> py_pdf_parser.filtering.ElementList:
+    """
+    Load the elements between the last reading start and the first with end.
+
+    Laying out text is by far the slowest part of loading a PDF, yet we only
+    care about the few pages holding the transactions. We first scan the raw
+    text of every page for the markers, then only lay out the pages spanning
+    them. If the markers can't be pinned down that way (eg. fonts without a
+    unicode mapping), every page is laid out, as py_pdf_parser would.
+    """
+    section = _section(_scan(f), start, end)
+    if section is not None:
+        try:
+            return _between(_load(f, section, fname), start, end)
+        except IndexError:
+            pass
+
+    return _between(_load(f, None, fname), start, end)
@@ -0,0 +1,226 @@
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sized
+from typing import Any
+from typing import NamedTuple
+from typing import TextIO
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+import click
+
+if TYPE_CHECKING:
+    from .utils import Importer
+
+
+R = TypeVar('R')
+
+# The cProfile stats of stages run by no importer (eg. loading the ledger).
+RUN = 'run'
+
+profile_option = click.option(
+    '--profile', is_flag=True,
+    help='Report the time and memory spent in each stage, running serially.',
+)
+profile_dir_option = click.option(
+    '--profile-dir', metavar='DIR', type=click.Path(file_okay=False),
+    help=(
+        'Profile as --profile, also writing profile.json and the cProfile '
+        'stats of each importer into DIR.'
+    ),
+)
+
+
+class Stage(NamedTuple):
+    """The measurements of one stage of processing one file."""
+    stage: str
+    fname: str | None
+    importer: str | None
+    seconds: float
+    rows_in: int | None
+    rows_out: int | None
+    # bytes allocated on top of what was already in use when it started
+    peak: int
+
+
+def _total(counts: Iterable[int | None]) -> int | str:
+    known = [x for x in counts if x is not None]
+    return sum(known) if known else '-'
+
+
+class Profiler:
+    """
+    Measurements of each stage of a run, see measure().
+
+    Memory is traced with tracemalloc (and, if requested, calls with cProfile)
+    which noticeably slows everything down: timings are best compared to each
+    other, rather than to those of a run without profiling.
+    """
+
+    def __init__(self, cprofile: bool = False) -> None:
+        self.stages: list[Stage] = []
+        self.counters: dict[str, dict[str, int]] = {}
+        self.cprofile = cprofile
+        self.profiles: dict[str, cProfile.Profile] = {}
+
+    def measure(
+            self,
+            stage: str,
+            func: Callable[[], R],
+            *,
+            fname: str | None = None,
+            importer: str | None = None,
+            rows_in: int | None = None,
+    ) -> R:
+        """Run func as a stage, counting its output rows if it has a len()."""
+        profile = None
+        if self.cprofile:
+            profile = self.profiles.setdefault(
+                importer or RUN, cProfile.Profile(),
+            )
+
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            result = func()
+        finally:
+            if profile:
+                profile.disable()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base
+
+        rows_out = len(result) if isinstance(result, Sized) else None
+        self.stages.append(
+            Stage(stage, fname, importer, seconds, rows_in, rows_out, peak),
+        )
+        return result
+
+    def table(self) -> list[tuple[Any, ...]]:
+        """Total each stage of each importer, under a header row."""
+        groups: dict[tuple[str, str], list[Stage]] = (
+            collections.defaultdict(list)
+        )
+        for x in self.stages:
+            importer = (x.importer or '').rsplit('.', 1)[-1]
+            groups[x.stage, importer].append(x)
+
+        rows: list[tuple[Any, ...]] = [
+            ('stage', 'importer', 'files', 'seconds', 'in', 'out', 'KiB'),
+        ]
+        # N.B. stages are listed in the order they first ran
+        order = list(dict.fromkeys(x.stage for x in self.stages))
+        for (stage, importer), xs in sorted(
+                groups.items(), key=lambda x: order.index(x[0][0]),
+        ):
+            rows.append((
+                stage,
+                importer,
+                len({x.fname for x in xs if x.fname}) or '',
+                f'{sum(x.seconds for x in xs):.3f}',
+                _total(x.rows_in for x in xs),
+                _total(x.rows_out for x in xs),
+                max(x.peak for x in xs) // 1024,
+            ))
+        seconds = sum(x.seconds for x in self.stages)
+        rows.append(('total', '', '', f'{seconds:.3f}', '', '', ''))
+        return rows
+
+    def summary(self, out: TextIO) -> None:
+        """Write the table of totals and the counters."""
+        rows = self.table()
+        widths = [max(len(str(x[i])) for x in rows) for i in range(7)]
+        for row in rows:
+            cells = (
+                str(x).ljust(w) if i < 2 else str(x).rjust(w)
+                for i, (x, w) in enumerate(zip(row, widths))
+            )
+            out.write('  '.join(cells).rstrip() + '\n')
+
+        for name, counter in self.counters.items():
+            values = ', '.join(f'{k}={v}' for k, v in counter.items())
+            out.write(f'{name}: {values}\n')
+
+    def dump(self, path: str) -> None:
+        """
+        Write every measurement as JSON, and the cProfile stats if any.
+
+        Stats are written per importer, and to run.prof for the stages which
+        belong to no importer (eg. loading the ledger).
+        """
+        os.makedirs(path, exist_ok=True)
+        with open(
+                os.path.join(path, 'profile.json'), 'w', encoding='utf-8',
+        ) as f:
+            json.dump(
+                {
+                    'stages': [x._asdict() for x in self.stages],
+                    'counters': self.counters,
+                },
+                f,
+                indent=1,
+            )
+
+        for importer, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(path, f'{importer}.prof'))
+
+
+def measure(
+        profiler: Profiler | None,
+        stage: str,
+        func: Callable[[], R],
+        **kwargs: Any,
+) -> R:
+    """Measure func with profiler, or just run it if there is none."""
+    if profiler is None:
+        return func()
+    return profiler.measure(stage, func, **kwargs)
+
+
+@contextlib.contextmanager
+def profiling(
+        importers: Iterable['Importer'],
+        enabled: bool,
+        path: str | None,
+        out: TextIO,
+) -> Iterator[Profiler | None]:
+    """
+    Profile importers for the duration of the context, if enabled.
+
+    The summary is written to out. If path is set, the JSON dump and the
+    cProfile stats of each importer are also written into that directory.
+    """
+    if not enabled and not path:
+        yield None
+        return
+
+    importers = list(importers)
+    profiler = Profiler(cprofile=bool(path))
+    for x in importers:
+        x.profiler = profiler
+    tracemalloc.start()
+    try:
+        yield profiler
+    finally:
+        tracemalloc.stop()
+        for x in importers:
+            x.profiler = None
+            info = x.matcher.cache_info()
+            if info.hits or info.misses:
+                profiler.counters[f'patterns ({x.account_name})'] = {
+                    'hits': info.hits, 'misses': info.misses,
+                }
+
+        profiler.summary(out)
+        if path:
+            profiler.dump(path)
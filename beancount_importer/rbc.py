@@ -1,10 +1,10 @@
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
 from .utils import Importer
 
@@ -19,16 +19,22 @@ class RbcImporter(Importer):
     # single account.
     # This regex should match the name produced by that method.
     _regex_fname = re.compile(r'rbc(\d{4}).csv\d+\.csv')
+    _regex_merged = re.compile(r'csv\d+\.csv')
+    _split_column = 'Account Number'
+
+    @classmethod
+    def _split_fname(cls, fname: str, account: str) -> str:
+        return f'rbc{account[-4:]}.{fname}'
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
         if not row['Account Number'].endswith(self.lastfour):
             return None
 
-        date = parse(row['Transaction Date']).date()
+        date = self._date(row['Transaction Date'])
         payee: str | None = row['Description 2'].strip() or None
         narration = row['Description 1']
         amt = self._amount(row['CAD$'])
@@ -0,0 +1,34 @@
+import importlib
+from collections.abc import Iterator
+from collections.abc import Mapping
+from typing import cast
+
+from .utils import Importer
+
+
+class LazyImporters(Mapping[str, type[Importer]]):
+    """
+    Map config section names to importer classes, importing them on demand.
+
+    Importer modules pull in heavy dependencies (openpyxl, pdfminer, ...), so
+    we avoid loading any of them until a config section actually needs it.
+    Likewise, the slowest of those dependencies (openpyxl, py_pdf_parser,
+    titlecase and dateutil) are only imported by the functions which use
+    them, so that eg. a config of CSV importers never loads any of them. See
+    ``python -m benchmarks startup`` for the difference this makes.
+    """
+
+    def __init__(self, paths: dict[str, str]) -> None:
+        # section name -> 'module:ClassName', relative to this package
+        self._paths = paths
+
+    def __getitem__(self, name: str) -> type[Importer]:
+        module, cls = self._paths[name].split(':')
+        imported = importlib.import_module(f'.{module}', __package__)
+        return cast(type[Importer], getattr(imported, cls))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
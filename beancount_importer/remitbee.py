@@ -2,6 +2,7 @@ import datetime
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
@@ -18,7 +19,7 @@ class RemitbeeImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
         recipient = row['Recipient']
@@ -1,37 +1,44 @@
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
+from .schema import Schema
 from .utils import Importer
 
 
 class RevolutImporter(Importer):
     _default_currency = 'EUR'
     _regex_fname = re.compile(r'account-statement.*\.csv')
+    _schemas = (
+        Schema(
+            date='Completed Date',
+            description='Description',
+            amount='Amount',
+            currency='Currency',
+        ),
+        Schema(
+            date='Data de Conclusão',
+            description='Descrição',
+            amount='Montante',
+            currency='Moeda',
+        ),
+    )
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction:
-        try:
-            # TODO: check the strip/replaces
-            date = parse(row['Data de Conclusão'].strip()).date()
-            # TODO: parse out payee vs narration?
-            narration = row['Descrição'].strip()
-            amt_raw = row['Montante'].replace("'", '').strip()
-            amt = self._amount(amt_raw, row['Moeda'])
-        except KeyError:
-            # TODO: check the strip/replaces
-            date = parse(row['Completed Date'].strip()).date()
-            # TODO: parse out payee vs narration?
-            narration = row['Description'].strip()
-            amt_raw = row['Amount'].replace("'", '').strip()
-            amt = self._amount(amt_raw, row['Currency'])
+        # TODO: check the strip/replaces
+        date = self._date(row['date'].strip())
+        # TODO: parse out payee vs narration?
+        narration = row['description'].strip()
+        amt_raw = row['amount'].replace("'", '').strip()
+        amt = self._amount(amt_raw, row['currency'])
 
         return self._transaction(
             meta=meta,
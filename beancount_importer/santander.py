@@ -1,14 +1,12 @@
 import collections
-import io
 import re
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
-import py_pdf_parser.loaders
-import py_pdf_parser.tables
 from beancount.core import data
-from dateutil.parser import parse
 
+from .containers import JAVA_SERIALIZED
 from .utils import Importer
 
 
@@ -16,17 +14,18 @@ class SantanderImporter(Importer):
     _default_currency = 'EUR'
     _require_lastfour = True
     _regex_fname = re.compile(r'^EXTCON\d{8}0001\d+(\d{4}).pdf$')
+    _containers = (JAVA_SERIALIZED,)
 
-    def _parse_amount(self, row: dict[str, Any]) -> str:
+    def _parse_amount(self, row: Mapping[str, Any]) -> str:
         amt: str = row['Amount'].replace('.', '').replace(',', '.')
         return amt
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction:
-        date = parse(row['Date']).date()
+        date = self._date(row['Date'])
         narration = row['Description']
         amt = self._amount(self._parse_amount(row))
 
@@ -40,32 +39,16 @@ class SantanderImporter(Importer):
         )
 
     def _extract(self, fname: str) -> Iterator[data.Transaction]:
-        # pylint: disable=too-complex,too-many-locals
+        # pylint: disable=too-complex,too-many-locals,import-outside-toplevel
+        from .pdf import load_between
+
         year = fname.rsplit('/', 1)[-1].replace('EXTCON', '')[:4]
-        with open(fname, 'rb') as f:
-            header_bytes = f.read(27)
-            if header_bytes.startswith(b'\xac\xed\x00\x05'):
-                # Handle Java serialized byte array wrapping the PDF
-                f.seek(0)
-                content = f.read()
-                pdf_start = content.find(b'%PDF-')
-                if pdf_start != -1:
-                    iostream = io.BytesIO(content[pdf_start:])
-                    doc = py_pdf_parser.loaders.load(iostream)
-                else:
-                    f.seek(0)
-                    doc = py_pdf_parser.loaders.load(f)
-            else:
-                f.seek(0)
-                doc = py_pdf_parser.loaders.load(f)
-
-        header = doc.elements.filter_by_text_equal(
-            'Detalhe de Movimentos da Conta à Ordem',
-        )[-1]
-        footer = doc.elements.filter_by_text_contains(
-            'Saldo Disponível Final',
-        )[0]
-        body = doc.elements.between(header, footer)
+        with self._open(fname) as f:
+            body = load_between(
+                f,
+                'Detalhe de Movimentos da Conta à Ordem',
+                'Saldo Disponível Final',
+            )
 
         rows = collections.defaultdict(list)
         for el in body:
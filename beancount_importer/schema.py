@@ -0,0 +1,82 @@
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import Any
+
+
+class Schema:
+    """
+    The columns an importer reads from a file, by field name.
+
+    Each field maps to the header name it appears under, or to a tuple of
+    possible names. A schema with no fields exposes every column under its own
+    header name.
+    """
+
+    def __init__(self, **fields: str | tuple[str, ...]) -> None:
+        self.fields = {
+            k: (v,) if isinstance(v, str) else v
+            for k, v in fields.items()
+        }
+
+    def resolve(self, header: Sequence[str]) -> dict[str, int] | None:
+        # N.B. as with csv.DictReader, the last duplicate column wins
+        positions = {name: i for i, name in enumerate(header)}
+        if not self.fields:
+            return positions
+
+        index: dict[str, int] = {}
+        for field, names in self.fields.items():
+            position = next(
+                (positions[x] for x in names if x in positions),
+                None,
+            )
+            if position is None:
+                return None
+            index[field] = position
+        return index
+
+
+def resolve(
+        schemas: Iterable[Schema],
+        header: Sequence[str],
+) -> dict[str, int]:
+    """Resolve a header against the first matching layout variant."""
+    for schema in schemas:
+        index = schema.resolve(header)
+        if index is not None:
+            return index
+
+    raise ValueError(f'unrecognized header: {list(header)}')
+
+
+class Row(Mapping[str, Any]):
+    """
+    A read-only view of one row, addressed by field name.
+
+    The index is shared by every row of a file, so each row only costs a
+    small slotted object rather than a dict of every column.
+    """
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index: dict[str, int], values: Sequence[Any]) -> None:
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, field: str) -> Any:
+        position = self._index[field]
+        # as with csv.DictReader, short rows are padded with None
+        if position < len(self._values):
+            return self._values[position]
+        return None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f'Row({dict(self)})'
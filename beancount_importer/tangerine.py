@@ -1,11 +1,12 @@
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
-from dateutil.parser import parse
 
+from .schema import Schema
 from .utils import Importer
 
 
@@ -13,16 +14,24 @@ class TangerineImporter(Importer):
     _default_currency = 'CAD'
     _require_lastfour = True
     _regex_fname = re.compile(r'^(?:\d+ xxxx )?xxxx ?(\d+)\.(?:\d+\.)?CSV$')
+    _schemas = (
+        Schema(
+            date=('Date', 'Transaction date'),
+            memo='Memo',
+            name='Name',
+            amount='Amount',
+        ),
+    )
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
-        date = parse(row.get('Date') or row['Transaction date']).date()
-        payee: str | None = row['Memo'].strip() or None
-        narration = row['Name']
-        amt = self._amount(row['Amount'])
+        date = self._date(row['date'])
+        payee: str | None = row['memo'].strip() or None
+        narration = row['name']
+        amt = self._amount(row['amount'])
         if amt == self._amount('0'):
             return None
 
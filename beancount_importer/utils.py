@@ -1,17 +1,22 @@
+import collections
+import concurrent.futures
+import contextlib
 import csv
 import datetime
 import decimal
-import enum
+import gc
 import os
 import re
 from collections.abc import Callable
 from collections.abc import Iterable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
+from typing import BinaryIO
 from typing import cast
-from typing import Self
+from typing import TYPE_CHECKING
+from typing import TypeVar
 
-import titlecase
 from beancount.core import amount
 from beancount.core import data
 from beancount.core import flags
@@ -19,6 +24,28 @@ from beancount.core import number
 from beancount.core import position
 from beangulp import importer  # type: ignore[import-untyped]
 
+from . import chunks
+from .cache import ExtractCache
+from .cache import paused_gc
+from .cache import ParseCache
+from .casing import Casing
+from .casing import normalize
+from .containers import Container
+from .containers import unwrap
+from .dates import DateParser
+from .dedupe import Index
+from .patterns import AccountPattern
+from .patterns import PatternMatcher
+from .schema import resolve
+from .schema import Row
+from .schema import Schema
+
+if TYPE_CHECKING:
+    from .profiling import Profiler
+
+
+T = TypeVar('T')
+
 
 # TODO: until the beancount.core.data type hints are working, this isn't very
 # useful.
@@ -28,105 +55,176 @@ from beangulp import importer  # type: ignore[import-untyped]
 #              | data.Price | data.Query | data.Transaction)
 
 
-class AccountPatternTarget(str, enum.Enum):
-    BOTH = 'both'
-    EITHER = 'either'
-    NARRATION = 'narration'
-    PAYEE = 'payee'
-
-
-class AccountPattern:
-    def __init__(
-            self,
-            account: data.Account,
-            pattern: str,
-            *,
-            flag: data.Flag | None = None,
-            target: AccountPatternTarget = AccountPatternTarget.EITHER,
-    ) -> None:
-        self.account = account
-        self.flag = flag
-        self.pattern = re.compile(pattern)
-        self.target = target
-
-    @classmethod
-    def from_config(cls, raw: list[str]) -> Self:
-        kind, account, pattern, *extra = raw
-        target = AccountPatternTarget(kind)
-        flag = extra[0] if extra else None
-        return cls(account, pattern, flag=flag, target=target)
-
-    def __repr__(self) -> str:
-        return (
-            f'AccountPattern({self.account}, {self.pattern}, {self.flag}, '
-            f'{self.target}'
-        )
-
-    def matches(self, tx: data.Transaction) -> bool:
-        if self.target == AccountPatternTarget.NARRATION and tx.narration:
-            return bool(self.pattern.search(tx.narration))
-        if self.target == AccountPatternTarget.PAYEE and tx.payee:
-            return bool(self.pattern.search(tx.payee))
-        if self.target == AccountPatternTarget.BOTH:
-            return bool(
-                self.pattern.search(f'{tx.payee or ""};{tx.narration or ""}'),
-            )
-        if self.target == AccountPatternTarget.EITHER:
-            if tx.narration and self.pattern.search(tx.narration):
-                return True
-            if tx.payee and self.pattern.search(tx.payee):
-                return True
-
-        return False
-
-    def posting(self, tx: data.Transaction) -> data.Posting:
-        # TODO: should be inferable somehow if null?
-        assert tx.postings[0].units
-
-        amt = -tx.postings[0].units
-        return data.Posting(self.account, amt, None, None, self.flag, None)
-
-
 class Importer(importer.Importer):  # type: ignore[misc]
+    # pylint: disable=too-many-instance-attributes
+    # number of parsed files kept in memory, shared by date() and extract()
+    _cache_size: int = 32
+    # wrappers which statements may come in, see _open()
+    _containers: tuple[Container, ...] = ()
     _default_currency: data.Currency | None = None
     _require_lastfour: bool = False
     _regex_fname: re.Pattern[str]
+    # exports covering several accounts, which split() breaks apart by the
+    # value of _split_column
+    _regex_merged: re.Pattern[str] | None = None
+    _split_column: str
+    # accepted layouts of the file, the first one matching the header wins
+    _schemas: tuple[Schema, ...] = (Schema(),)
+    # set while a run is being profiled, see profiling.profiling()
+    profiler: 'Profiler | None' = None
+    # worker processes a chunked file is spread over (every core if unset),
+    # set in the workers of --jobs, see workers.process()
+    chunk_jobs: int | None = None
 
     def __init__(
             self,
             account_name: data.Account,
             *,
             account_patterns: list[AccountPattern] | None = None,
+            casing: Casing = Casing.TITLECASE,
+            chunk_size: int | None = None,
             currency: data.Currency | None = None,
+            dedupe_window: int = 2,
             lastfour: str | None = None,
+            parse_cache: ParseCache | None = None,
     ) -> None:
         self.account_name = str(account_name)
         self.account_patterns = account_patterns or []
+        self.matcher = PatternMatcher(self.account_patterns)
+        self.casing = Casing(casing)
+        self.chunk_size = chunk_size
         self.currency = currency or self._default_currency
+        self.dedupe_window = dedupe_window
         self.lastfour = lastfour
+        self.parse_cache = parse_cache
+        self._cache = ExtractCache(self._cache_size)
+        self._dates = DateParser()
 
         if self._require_lastfour and self.lastfour is None:
             raise ValueError('lastfour="xxxx" must be provided')
 
+    def __getstate__(self) -> dict[str, Any]:
+        # N.B. caches (and the profiler) belong to the process which made them
+        state = self.__dict__.copy()
+        for key in ('matcher', 'profiler', '_cache', '_dates'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.matcher = PatternMatcher(self.account_patterns)
+        self._cache = ExtractCache(self._cache_size)
+        self._dates = DateParser()
+
     def account(self, _fname: str) -> str:
         return self.account_name
 
     def date(self, fname: str) -> datetime.datetime | None:
         try:
-            # TODO: pass in existing somehow
-            value = max(x.date for x in self.extract(fname, []))
+            value = max(x.date for x in self._cache.get(fname, self._parse))
         except ValueError:
             # why are you filing this, anyway?
             return None
 
         return cast(datetime.datetime, value)
 
+    def deduplicate(
+            self,
+            entries: list[data.Transaction],
+            existing: list[data.Directive] | Index,
+    ) -> None:
+        """
+        Mark entries duplicating existing ones within dedupe_window days.
+
+        Callers handling many files should build the Index once and pass it
+        in, rather than the entries it would be built from.
+        """
+        if not isinstance(existing, Index):
+            existing = Index(existing)
+        existing.mark(entries, self.dedupe_window)
+
+    def chunked(self, fname: str) -> bool:
+        """Whether fname is split into chunks, which are parsed in parallel."""
+        # N.B. only the csv reader of this class knows how to read a chunk
+        return (
+            self.chunk_size is not None
+            and type(self)._extract is Importer._extract
+            and (os.cpu_count() or 1) > 1
+            and os.path.getsize(fname) > self.chunk_size
+        )
+
     def identify(self, fname: str) -> bool:
         match = self._regex_fname.match(os.path.basename(fname))
         if not match:
             return False
         return self.lastfour is None or self.lastfour == match.group(1)
 
+    @classmethod
+    def is_merged(cls, fname: str) -> bool:
+        regex = cls._regex_merged
+        return bool(regex and regex.match(os.path.basename(fname)))
+
+    @classmethod
+    def split(cls, fname: str) -> dict[str, str]:
+        """
+        Break apart a merged export into one file per account.
+
+        The export is streamed once, with each row written straight to the
+        file of its account. Returns the path written for each account.
+        """
+        dirname, basename = os.path.split(fname)
+        written: dict[str, str] = {}
+        writers: dict[str, Any] = {}
+        with contextlib.ExitStack() as stack:
+            f = stack.enter_context(
+                open(fname, encoding='utf-8-sig', newline=''),
+            )
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return written
+
+            column = header.index(cls._split_column)
+            for row in reader:
+                if not row or cls._is_split_footer(row):
+                    continue
+
+                account = row[column]
+                if account not in writers:
+                    path = os.path.join(
+                        dirname, cls._split_fname(basename, account),
+                    )
+                    out = stack.enter_context(
+                        open(path, 'w', encoding='utf-8', newline=''),
+                    )
+                    writers[account] = csv.writer(out, lineterminator='\n')
+                    writers[account].writerow(header)
+                    written[account] = path
+
+                writers[account].writerow(row)
+
+        return written
+
+    @classmethod
+    def _split_fname(cls, fname: str, account: str) -> str:
+        # N.B. must match _regex_fname for the configured accounts
+        return f'{account}.{fname}'
+
+    @classmethod
+    def _is_split_footer(cls, row: list[str]) -> bool:
+        _ = row
+        return False
+
+    def invalidate(self, fname: str | None = None) -> None:
+        """Drop cached extraction results for fname, or for every file."""
+        self._cache.invalidate(fname)
+
+    def _case(self, x: str) -> str:
+        return normalize(x, self.casing)
+
+    def _date(self, raw: str) -> datetime.date:
+        return self._dates(raw).date()
+
     def _amount(
             self,
             raw: str | decimal.Decimal,
@@ -151,8 +249,8 @@ class Importer(importer.Importer):  # type: ignore[misc]
             meta=meta,
             date=date,
             flag=flags.FLAG_OKAY,
-            payee=titlecase.titlecase(payee.strip()) if payee else None,
-            narration=titlecase.titlecase(narration.strip()),
+            payee=self._case(payee.strip()) if payee else None,
+            narration=self._case(narration.strip()),
             tags=data.EMPTY_SET,
             links=data.EMPTY_SET,
             postings=postings or [],
@@ -171,16 +269,98 @@ class Importer(importer.Importer):  # type: ignore[misc]
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
         raise NotImplementedError()
 
+    def _open(self, fname: str) -> contextlib.AbstractContextManager[BinaryIO]:
+        """Open a statement for binary reading, unwrapping it if needed."""
+        return unwrap(fname, self._containers)
+
     def _extract(self, fname: str) -> Iterator[data.Transaction | None]:
-        with open(fname, encoding='utf-8') as f:
-            for index, row in enumerate(csv.DictReader(f)):
-                meta = data.new_metadata(fname, index)
-                yield self._extract_from_row(row, meta)
+        # N.B. utf-8-sig strips the byte order mark some banks prepend
+        with open(fname, encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            yield from self._extract_records(fname, header, reader)
+
+    def _extract_records(
+            self,
+            fname: str,
+            header: list[str],
+            reader: Iterable[list[str]],
+            start: int = 0,
+    ) -> Iterator[data.Transaction | None]:
+        index = resolve(self._schemas, header)
+        for lineno, values in enumerate((x for x in reader if x), start):
+            meta = data.new_metadata(fname, lineno)
+            yield self._extract_from_row(Row(index, values), meta)
+
+    def _parse_chunk(
+            self,
+            fname: str,
+            header: list[str],
+            chunk: chunks.Chunk,
+            fmt: str | None = None,
+    ) -> list[data.Transaction]:
+        if fmt is not None:
+            self._dates.format = fmt
+        records = chunks.records(fname, chunk)
+        xs = self._extract_records(fname, header, records, chunk.lineno)
+        return list(self._add_postings(self._filter(xs)))
+
+    def _iter_chunks(self, fname: str) -> Iterator[data.Transaction]:
+        """
+        Parse and categorize fname in chunks, spread over worker processes.
+
+        The first (small) chunk is parsed here, so that every worker is handed
+        the date format it sniffed. Results are yielded in order.
+        """
+        self._dates = DateParser()
+        assert self.chunk_size is not None
+        planned = chunks.plan(fname, self.chunk_size)
+        if planned is None:
+            yield from self._add_postings(self._filter(self._extract(fname)))
+            return
+
+        header, (head, *rest) = planned
+        yield from self._parse_chunk(fname, header, head)
+
+        jobs = self.chunk_jobs or os.cpu_count() or 1
+        if jobs <= 1:
+            for chunk in rest:
+                yield from self._parse_chunk(fname, header, chunk)
+            return
+
+        # N.B. transactions hold no reference cycles, but are numerous enough
+        # to trigger many (pointless) passes, both while the workers build
+        # them and while they are unpickled here
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=gc.disable,
+        )
+        # as in workers.process(), only a few chunks are parsed ahead of the
+        # one being waited on
+        pending: collections.deque[
+            concurrent.futures.Future[list[data.Transaction]]
+        ] = collections.deque()
+        with paused_gc():
+            try:
+                for chunk in rest:
+                    pending.append(pool.submit(
+                        self._parse_chunk, fname, header, chunk,
+                        self._dates.format,
+                    ))
+                    if len(pending) > 2 * jobs:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                pool.shutdown(cancel_futures=True)
 
     def _filter(
             self,
@@ -193,10 +373,9 @@ class Importer(importer.Importer):  # type: ignore[misc]
             yield x
 
     def _add_posting(self, x: data.Transaction) -> data.Transaction:
-        for account_pattern in self.account_patterns:
-            if account_pattern.matches(x):
-                x.postings.append(account_pattern.posting(x))
-                break
+        account_pattern = self.matcher.match(x)
+        if account_pattern:
+            x.postings.append(account_pattern.posting(x))
         # TODO: else, ! Expenses:Unkown?
 
         return x
@@ -208,14 +387,102 @@ class Importer(importer.Importer):  # type: ignore[misc]
         for x in xs:
             yield self._add_posting(x)
 
-    def extract(
+    def _cache_params(self) -> tuple[Any, ...]:
+        # anything which changes the output of _extract() must be listed here
+        return self.account_name, self.casing, self.currency, self.lastfour
+
+    def _measure(
             self,
+            stage: str,
             fname: str,
-            _existing: list[data.Transaction],
+            func: Callable[[], list[T]],
+            rows_in: int | None = None,
+    ) -> list[T]:
+        if self.profiler is None:
+            return func()
+        return self.profiler.measure(
+            stage, func, fname=fname, importer=self.name, rows_in=rows_in,
+        )
+
+    def _read(self, fname: str) -> list[data.Transaction]:
+        if self.profiler is None:
+            return list(self._filter(self._extract(fname)))
+
+        # N.B. stages are only split apart when profiling, since doing so
+        # keeps every intermediate row in memory
+        rows = self._measure(
+            'extract', fname, lambda: list(self._extract(fname)),
+        )
+        return self._measure(
+            'filter', fname, lambda: list(self._filter(rows)), len(rows),
+        )
+
+    def _rows(self, fname: str) -> list[data.Transaction]:
+        # date formats are sniffed per-file
+        self._dates = DateParser()
+        if self.parse_cache is None:
+            return self._read(fname)
+
+        cls = type(self)
+        return self.parse_cache.get(
+            fname,
+            f'{cls.__module__}.{cls.__qualname__}',
+            self._cache_params(),
+            self._read,
+        )
+
+    def _parse(
+            self,
+            fname: str,
+            read: Callable[[str], list[data.Transaction]] | None = None,
     ) -> list[data.Transaction]:
         # TODO: print proposed data.Balance() record at end?
         # It should be manually checked anyway, so probably a bad idea to emit
-        return list(self._add_postings(self._filter(self._extract(fname))))
+        if self.chunked(fname):
+            # N.B. rows come back categorized, so can't go in the parse cache
+            return self._measure(
+                'chunks', fname, lambda: list(self._iter_chunks(fname)),
+            )
+
+        rows = (read or self._rows)(fname)
+        return self._measure(
+            'postings', fname, lambda: list(self._add_postings(rows)),
+            len(rows),
+        )
+
+    def extract(
+            self,
+            fname: str,
+            _existing: list[data.Transaction],
+    ) -> list[data.Transaction]:
+        # N.B. beangulp sorts the returned list in-place, and duplicates are
+        # marked in the metadata of its entries, so hand out copies of both:
+        # the cached entries must outlive the run (eg. under bean-import serve)
+        return [
+            x._replace(meta=dict(x.meta), postings=list(x.postings))
+            for x in self._cache.get(fname, self._parse)
+        ]
+
+    def iter_extract(self, fname: str) -> Iterator[data.Transaction]:
+        """
+        Extract the transactions of fname one at a time, in statement order.
+
+        Unlike extract(), nothing is cached and the rows of the statement are
+        never all held in memory at once. Since dates are sniffed per file,
+        iterate over a single file of an importer at a time.
+
+        While profiling, each stage is measured as by extract(), which means
+        running each of them over the whole statement in turn.
+        """
+        if self.profiler is not None:
+            self._dates = DateParser()
+            return iter(self._parse(fname, self._read))
+
+        if self.chunked(fname):
+            return self._iter_chunks(fname)
+
+        self._dates = DateParser()
+        return self._add_postings(self._filter(self._extract(fname)))
 
     @classmethod
     def howto(
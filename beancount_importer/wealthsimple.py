@@ -2,11 +2,13 @@ import datetime
 import re
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
 from typing import Any
 
 from beancount.core import data
 from beancount.core import position
 
+from .schema import Schema
 from .utils import Importer
 
 
@@ -19,7 +21,7 @@ class WealthsimpleCreditCardImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
         date = datetime.datetime.fromisoformat(row['transaction_date'])
@@ -64,11 +66,38 @@ class WealthsimpleImporter(Importer):
         r'^(?:\w+\-)?monthly-statement-transactions-'
         r'[\d\w]{5}([\d\w]{4})\w{3}[-\d]+.csv$',
     )
+    _regex_merged = re.compile(r'^activities-export-\d+-\d+-\d+\.csv')
+    _split_column = 'account_id'
+    _schemas = (
+        # monthly statement
+        Schema(date='date', description='description', amount='amount'),
+        # synthetic data from split()
+        Schema(
+            transaction_date='transaction_date',
+            activity_type='activity_type',
+            activity_sub_type='activity_sub_type',
+            direction='direction',
+            symbol='symbol',
+            quantity='quantity',
+            unit_price='unit_price',
+            currency='currency',
+            net_cash_amount='net_cash_amount',
+        ),
+    )
+
+    @classmethod
+    def _split_fname(cls, fname: str, account: str) -> str:
+        _ = fname
+        return f'monthly-statement-transactions-{account}-0.csv'
+
+    @classmethod
+    def _is_split_footer(cls, row: list[str]) -> bool:
+        return row[0].startswith('As of ')
 
     def _parse_stock_row(
             self,
             date: datetime.datetime,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
     ) -> list[data.Posting]:
         price = self._amount(row['unit_price'], row['currency'])
 
@@ -107,16 +136,16 @@ class WealthsimpleImporter(Importer):
 
     def _extract_from_row(
             self,
-            row: dict[str, Any],
+            row: Mapping[str, Any],
             meta: data.Meta,
     ) -> data.Transaction | None:
         postings: list[data.Posting] = []
-        try:
+        if 'date' in row:
             # monthly statement
             date = datetime.datetime.fromisoformat(row['date'])
             narration = row['description']
             amt = self._amount(row['amount'])  # TODO: currency?
-        except KeyError:
+        else:
             # synthetic data from split()
             date = datetime.datetime.fromisoformat(row['transaction_date'])
             narration = row['activity_type']
@@ -0,0 +1,153 @@
+import collections
+import concurrent.futures
+import os
+import traceback
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+from typing import NamedTuple
+from typing import Protocol
+
+import beangulp.exceptions  # type: ignore[import-untyped]
+import beangulp.identify  # type: ignore[import-untyped]
+import click
+
+from .dispatch import Dispatcher
+from .utils import Importer
+
+
+# Ported from beangulp v0.2.0, with the per-file work split out so that it can
+# be fanned out to a process pool.
+# https://github.com/beancount/beangulp/blob/v0.2.0/beangulp/__init__.py
+
+
+class Context(Protocol):
+    dispatcher: Dispatcher
+
+
+class Result(NamedTuple):
+    fname: str
+    # index into the importers list, which is identical in every process
+    importer: int | None = None
+    value: Any = None
+    error: str | None = None
+    skipped: bool = False
+    # already handled by a previous run, according to the manifest
+    done: bool = False
+
+
+# The importers of the current process, see _init().
+_dispatcher = Dispatcher([])
+
+
+def _use(dispatcher: Dispatcher) -> None:
+    global _dispatcher  # pylint: disable=global-statement
+    _dispatcher = dispatcher
+
+
+def _init(factory: Callable[[], Context], chunk_jobs: int) -> None:
+    dispatcher = factory().dispatcher
+    for x in dispatcher.importers:
+        x.chunk_jobs = chunk_jobs
+    _use(dispatcher)
+
+
+def _format_error(e: Exception) -> str:
+    # mirrors beangulp.exceptions.ExceptionsTrap
+    if isinstance(e, beangulp.exceptions.Error):
+        return str(e)
+
+    exc = ''.join(traceback.format_exception(e)).rstrip()
+    return f'Exception in importer code.\n{exc}'
+
+
+def _too_large(fname: str) -> bool:
+    if os.path.getsize(fname) <= beangulp.identify.FILE_TOO_LARGE_THRESHOLD:
+        return False
+    # N.B. unless it is split into chunks, which is meant for large files
+    return not any(x.chunked(fname) for x in _dispatcher.candidates(fname))
+
+
+def handle(
+        fname: str,
+        func: Callable[[Importer, str], Any],
+) -> Result:
+    """Run func with the importer of fname, catching any error."""
+    if _too_large(fname):
+        return Result(fname, skipped=True)
+
+    index: int | None = None
+    try:
+        importer = _dispatcher.identify(fname)
+        if not importer:
+            return Result(fname)
+
+        index = _dispatcher.importers.index(importer)
+        return Result(fname, index, func(importer, fname))
+    except Exception as e:
+        return Result(fname, index, error=_format_error(e))
+
+
+Pending = tuple[str, 'concurrent.futures.Future[Result] | None']
+
+
+def _result(pending: Pending) -> Result:
+    fname, future = pending
+    return Result(fname, done=True) if future is None else future.result()
+
+
+def process(
+        ctx: Context,
+        func: Callable[[str], Result],
+        fnames: Iterable[str],
+        jobs: int,
+        done: Callable[[str], bool] | None = None,
+) -> Iterator[Result]:
+    """
+    Run func over every file, yielding results in the order of fnames.
+
+    With jobs > 1, files are handed out to a pool of worker processes, each of
+    which builds its own importers from the same config as ctx. Files which
+    are already done are not processed at all.
+
+    The cores are shared between workers: one which splits a file into chunks
+    spreads them over its share of the cores only, or parses them itself if
+    that share is a single core.
+    """
+    if jobs <= 1:
+        _use(ctx.dispatcher)
+        for fname in fnames:
+            if done and done(fname):
+                yield Result(fname, done=True)
+            else:
+                yield func(fname)
+        return
+
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init,
+        initargs=(type(ctx), max(1, (os.cpu_count() or 1) // jobs)),
+    )
+    # N.B. results are held until all those before them have been yielded, so
+    # only a few files are handed out ahead of the one being waited on
+    pending: collections.deque[Pending] = collections.deque()
+    try:
+        for fname in fnames:
+            future = None
+            if not done or not done(fname):
+                future = pool.submit(func, fname)
+            pending.append((fname, future))
+            if len(pending) > 2 * jobs:
+                yield _result(pending.popleft())
+
+        while pending:
+            yield _result(pending.popleft())
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+jobs_option = click.option(
+    '--jobs', '-j', type=click.IntRange(min=1), default=1,
+    help='Number of files to process in parallel.',
+)
@@ -0,0 +1,133 @@
+import functools
+import textwrap
+from collections.abc import Callable
+from typing import Any
+from typing import Protocol
+from typing import TextIO
+
+import beangulp.extract  # type: ignore[import-untyped]
+from beancount.core import data
+from beancount.parser import printer
+
+from .dedupe import Index
+from .dedupe import Overlaps
+from .dedupe import reference
+from .dedupe import report
+from .manifest import Manifest
+from .profiling import measure
+from .profiling import Profiler
+from .utils import Importer
+
+
+class Context(Protocol):
+    hooks: list[Any]
+    manifest: Manifest | None
+
+
+Extracted = tuple[str, list[data.Transaction], str, Importer]
+
+
+def _format(entry: data.Transaction) -> str:
+    # duplicates are commented out, noting what of
+    duplicate = entry.meta.pop(beangulp.extract.DUPLICATE, False)
+    text = printer.format_entry(entry)
+    if not duplicate:
+        return text
+
+    text = textwrap.indent(text, '; ')
+    if isinstance(duplicate, type(entry)):
+        filename = duplicate.meta.get('filename')
+        lineno = duplicate.meta.get('lineno')
+        if filename and lineno:
+            return f'; duplicate of {filename}:{lineno}\n{text}'
+    return text
+
+
+class Writer:
+    """
+    Deduplicate and write out the entries extracted from each file.
+
+    When streaming, each file is written out as soon as it is done with and
+    then dropped: only the reference() of its entries is kept, to deduplicate
+    later files against.
+    """
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    # pylint: disable=too-many-positional-arguments
+
+    def __init__(
+            self,
+            ctx: Context,
+            existing: list[data.Directive],
+            output: TextIO,
+            log: Callable[..., None],
+            profiler: Profiler | None,
+            streaming: bool,
+    ) -> None:
+        self.ctx = ctx
+        self.existing = existing
+        self.output = output
+        self.log = log
+        self.profiler = profiler
+        self.streaming = streaming
+        self.overlaps = Overlaps()
+        self.ledger = Index(existing)
+        self.seen = Index()
+        self.started = False
+
+    def _deduplicate(
+            self,
+            importer: Importer,
+            entries: list[data.Transaction],
+    ) -> None:
+        refs = [reference(x) for x in entries] if self.streaming else None
+        # N.B. statements overlapping earlier files of this run are matched
+        # exactly first, and only rows with no identical one in those files
+        # fall back to the importers' fuzzier matching against them. Every
+        # row is still checked against the ledger, though: an earlier file
+        # with fewer identical rows says nothing of the extra ones.
+        unseen = self.overlaps.mark(entries, refs)
+        importer.deduplicate(entries, self.ledger)
+        importer.deduplicate(unseen, self.seen)
+        self.seen.add(entries, refs)
+
+    def deduplicate(self, extracted: Extracted) -> None:
+        fname, entries, _account, importer = extracted
+        measure(
+            self.profiler, 'dedupe',
+            functools.partial(self._deduplicate, importer, entries),
+            fname=fname, importer=importer.name, rows_in=len(entries),
+        )
+        report(fname, entries, self.log)
+        if not self.streaming:
+            self.existing.extend(entries)
+
+    def _print(self, extracted: list[Extracted]) -> None:
+        # mirrors beangulp.extract.print_extracted_entries(), which would
+        # repeat the header for every streamed file
+        if extracted and not self.started:
+            self.output.write(beangulp.extract.HEADER + '\n')
+            self.started = True
+
+        for fname, entries, _account, _importer in extracted:
+            section = beangulp.extract.SECTION.format(fname)
+            self.output.write(section + '\n\n')
+            for entry in entries:
+                self.output.write(_format(entry) + '\n')
+            self.output.write('\n')
+        self.output.flush()
+
+    def write(self, extracted: list[Extracted]) -> None:
+        for func in self.ctx.hooks:
+            extracted = func(extracted, self.existing)
+
+        measure(
+            self.profiler, 'output', lambda: self._print(extracted),
+            rows_in=sum(len(x[1]) for x in extracted),
+        )
+        # N.B. the manifest is only saved if the whole run succeeds
+        if self.ctx.manifest:
+            for fname, entries, account, importer in extracted:
+                self.ctx.manifest.record(
+                    fname, 'extract', importer.name, account,
+                    [x.date for x in entries],
+                )
@@ -0,0 +1,57 @@
+from collections.abc import Iterator
+from collections.abc import Sequence
+from typing import Any
+
+from beancount.core import data
+
+from .schema import resolve
+from .schema import Row
+from .utils import Importer
+
+
+class XlsxImporter(Importer):
+    """
+    Base for importers of spreadsheets with a header row in the active sheet.
+
+    The workbook is opened in read-only mode and rows are streamed straight
+    from the underlying XML, so memory stays flat regardless of export size.
+    """
+    # pylint: disable=abstract-method
+
+    # values of the first cell which mark the header row
+    _header_markers: frozenset[str]
+
+    def _is_footer(self, raw: Sequence[Any]) -> bool:
+        _ = raw
+        return False
+
+    def _extract(self, fname: str) -> Iterator[data.Transaction | None]:
+        # pylint: disable=import-outside-toplevel
+        import openpyxl
+
+        wb = openpyxl.load_workbook(fname, read_only=True)
+        try:
+            ws = wb.active
+            if not ws:
+                return
+
+            header: dict[str, int] | None = None
+            index = 0
+            for raw in ws.iter_rows(values_only=True):
+                if raw and raw[0] in self._header_markers:
+                    header = resolve(
+                        self._schemas, raw,  # type: ignore[arg-type]
+                    )
+                    continue
+                if not header:
+                    continue
+                if self._is_footer(raw):
+                    break
+
+                meta = data.new_metadata(fname, index)
+                yield self._extract_from_row(Row(header, raw), meta)
+                index += 1
+            if not header:
+                raise ValueError('malformed workbook')
+        finally:
+            wb.close()
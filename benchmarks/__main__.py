@@ -0,0 +1,303 @@
+"""
+Benchmark each importer against synthetic statements.
+
+    $ python -m benchmarks run --rows 1000 --rows 100000 -o results.json
+    $ python -m benchmarks compare results.json
+    $ python -m benchmarks startup
+"""
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from collections.abc import Iterator
+from importlib import metadata
+from typing import Any
+
+import beangulp.extract  # type: ignore[import-untyped]
+import click
+
+from beancount_importer.cli import IMPORTERS
+from beancount_importer.patterns import AccountPattern
+from beancount_importer.profiling import Profiler
+from beancount_importer.utils import Importer
+from benchmarks.formats import FORMATS
+from benchmarks.formats import MERCHANTS
+from benchmarks.startup import measure as startup_times
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# N.B. a realistic config matches most, but not all, rows with a pattern
+PATTERNS = [
+    ['either', f'Expenses:Bench:{i}', f'(?i)^{name.split()[0]}.*$']
+    for i, name in enumerate(MERCHANTS[:-2])
+] + [
+    ['payee', 'Income:Salary', '^Acme.*$'],
+    ['narration', 'Expenses:Coffee', '(?i)coffee'],
+    ['either', 'Expenses:Groceries', 'Grocer(y|ies)|Mercado'],
+    ['both', 'Expenses:Transfer', '(?i)^online transfer;'],
+    ['payee', 'Expenses:Remittance', '^TRF to .* in Philippines$'],
+    ['narration', 'Expenses:Fees', '(?i)fee|charge', '!'],
+    ['either', 'Expenses:Unknown', r'#\d{4,}$'],
+    ['payee', 'Income:Interest', '^Interest.*$'],
+]
+
+
+def generate_file(name: str, rows: int, path: str) -> str:
+    """Write the statement of that format into the directory path."""
+    fmt = FORMATS[name]
+    fname = os.path.join(path, fmt.fname)
+    # N.B. seeded by format and size, so every run sees identical files
+    fmt.write(fname, rows, random.Random(f'{name}-{rows}'))
+    return fname
+
+
+def build(name: str) -> Importer:
+    fmt = FORMATS[name]
+    return IMPORTERS[fmt.importer](
+        f'Assets:Bench:{name.title().replace("-", "")}',
+        account_patterns=[AccountPattern.from_config(x) for x in PATTERNS],
+        lastfour=fmt.lastfour,
+    )
+
+
+# The stages of Importer.extract() reported, by those its profiler measures.
+STAGES = {
+    'parse': ('extract', 'filter'),
+    'categorize': ('postings',),
+}
+
+
+def _extract(name: str, fname: str) -> int:
+    # N.B. a fresh importer, so that nothing (eg. pattern matches) is cached
+    return len(beangulp.extract.extract_from_file(build(name), fname, []))
+
+
+def _profile(name: str, fname: str) -> dict[str, tuple[int, float, int]]:
+    """
+    Extract fname as bean-import does, measuring each of STAGES.
+
+    Stages are measured through the profiler importers report to under
+    --profile, returning the output rows, time and peak memory of each.
+    """
+    profiler = Profiler()
+    importer = build(name)
+    importer.profiler = profiler
+    beangulp.extract.extract_from_file(importer, fname, [])
+
+    results = {}
+    for stage, parts in STAGES.items():
+        xs = [x for x in profiler.stages if x.stage in parts]
+        results[stage] = (
+            xs[-1].rows_out or 0,
+            sum(x.seconds for x in xs),
+            max(x.peak for x in xs),
+        )
+    return results
+
+
+def measure(func: Callable[[], int], repeat: int) -> tuple[int, float, int]:
+    """
+    Run func, returning its output rows, best time and peak memory.
+
+    Memory is traced in a separate run, since tracemalloc slows everything
+    down too much for the timings to mean anything.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return out, best, peak
+
+
+def measure_stages(
+        name: str,
+        fname: str,
+        repeat: int,
+) -> dict[str, tuple[int, float, int]]:
+    """As measure(), for each of STAGES."""
+    # N.B. warm up first, so that lazy imports aren't counted as parsing
+    _profile(name, fname)
+    best = dict.fromkeys(STAGES, float('inf'))
+    for _ in range(repeat):
+        gc.collect()
+        for stage, (_out, seconds, _peak) in _profile(name, fname).items():
+            best[stage] = min(best[stage], seconds)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        traced = _profile(name, fname)
+    finally:
+        tracemalloc.stop()
+    return {
+        stage: (out, best[stage], peak)
+        for stage, (out, _seconds, peak) in traced.items()
+    }
+
+
+def _benchmark(
+        name: str,
+        rows: int,
+        repeat: int,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = generate_file(name, rows, tmp)
+        results = measure_stages(name, fname, repeat)
+        results['extract'] = measure(lambda: _extract(name, fname), repeat)
+        for stage, (out, seconds, peak) in results.items():
+            yield stage, {
+                'rows': rows,
+                'out': out,
+                'seconds': round(seconds, 6),
+                'rows_per_sec': round(rows / seconds, 1),
+                'peak_kib': peak // 1024,
+            }
+
+
+@click.group()
+def main() -> None:
+    pass
+
+
+@main.command()
+@click.argument('fmt', metavar='FORMAT', type=click.Choice(sorted(FORMATS)))
+@click.argument('rows', type=click.IntRange(1))
+@click.argument('out', type=click.Path(file_okay=False))
+def generate(fmt: str, rows: int, out: str) -> None:
+    """Write a synthetic statement of FORMAT into the directory OUT."""
+    os.makedirs(out, exist_ok=True)
+    click.echo(generate_file(fmt, rows, out))
+
+
+@main.command()
+@click.option(
+    '-f', '--format', 'formats', multiple=True,
+    type=click.Choice(sorted(FORMATS)),
+    help='Only benchmark these formats (default: all of them).',
+)
+@click.option(
+    '-n', '--rows', 'sizes', multiple=True, type=click.IntRange(10, 10**6),
+    help='Rows in each statement; may be repeated (default: 1000).',
+)
+@click.option('--repeat', default=3, type=click.IntRange(1),
+              help='Report the best time of this many runs.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False),
+              help='Write the results as JSON to this file.')
+def run(
+        formats: tuple[str, ...],
+        sizes: tuple[int, ...],
+        repeat: int,
+        output: str | None,
+) -> None:
+    """Measure rows/sec and peak memory of each stage of each format."""
+    results: dict[str, dict[str, Any]] = {}
+    for name in formats or sorted(FORMATS):
+        for rows in sizes or (1000,):
+            for stage, result in _benchmark(name, rows, repeat):
+                key = f'{name}/{rows}/{stage}'
+                results[key] = result
+                click.echo(
+                    f'{key:<44} {result["rows_per_sec"]:>12,.0f} rows/s '
+                    f'{result["peak_kib"]:>10,} KiB  ({result["out"]} out)',
+                    err=True,
+                )
+
+    doc = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'version': metadata.version('beancount-importer'),
+        },
+        'results': results,
+    }
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=1, sort_keys=True)
+            f.write('\n')
+    else:
+        json.dump(doc, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+@main.command()
+@click.option('--repeat', default=7, type=click.IntRange(1),
+              help='Report the median time of this many runs.')
+def startup(repeat: int) -> None:
+    """Measure the startup time of bean-import, with lazy and eager imports."""
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = generate_file('chase', 100, tmp)
+        for name, result in startup_times(fname, repeat):
+            imported = ', '.join(result['imported']) or 'none'
+            click.echo(
+                f'{name:<16} {result["lazy_ms"]:>8,.1f} ms lazy '
+                f'{result["eager_ms"]:>8,.1f} ms eager  '
+                f'(heavy imports: {imported})',
+            )
+
+
+def _regressions(
+        old: dict[str, Any],
+        new: dict[str, Any],
+        tolerance: float,
+) -> list[str]:
+    found = []
+    if new['out'] != old['out']:
+        found.append(f'{old["out"]} -> {new["out"]} rows out')
+    if new['rows_per_sec'] < old['rows_per_sec'] * (1 - tolerance):
+        found.append(
+            f'{old["rows_per_sec"]:,.0f} -> {new["rows_per_sec"]:,.0f} rows/s',
+        )
+    # N.B. ignore growth of a few KiB, which small statements are dominated by
+    if (new['peak_kib'] > old['peak_kib'] * (1 + tolerance)
+            and new['peak_kib'] - old['peak_kib'] > 64):
+        found.append(f'{old["peak_kib"]:,} -> {new["peak_kib"]:,} KiB')
+    return found
+
+
+@main.command()
+@click.argument('results', type=click.Path(exists=True, dir_okay=False))
+@click.option('--baseline', default=BASELINE, show_default=True,
+              type=click.Path(exists=True, dir_okay=False),
+              help='Results to compare against.')
+@click.option('--tolerance', default=0.2, show_default=True,
+              type=click.FloatRange(0),
+              help='Allowed slowdown or memory growth, as a fraction.')
+def compare(results: str, baseline: str, tolerance: float) -> None:
+    """Compare RESULTS to BASELINE, failing on any regression."""
+    with open(baseline, encoding='utf-8') as f:
+        old = json.load(f)['results']
+    with open(results, encoding='utf-8') as f:
+        new = json.load(f)['results']
+
+    failed = False
+    for key in sorted(old.keys() & new.keys()):
+        found = _regressions(old[key], new[key], tolerance)
+        status = 'REGRESSED' if found else 'OK'
+        click.echo(f'{key:<44} {status} {", ".join(found)}'.rstrip())
+        failed = failed or bool(found)
+
+    for key in sorted(old.keys() - new.keys()):
+        click.echo(f'{key:<44} MISSING')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
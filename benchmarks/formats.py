@@ -0,0 +1,388 @@
+import csv
+import datetime
+import random
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import NamedTuple
+
+from benchmarks import pdf
+
+
+START = datetime.datetime(2024, 1, 1, 9, 30)
+
+MERCHANTS = (
+    'Blue Bottle Coffee', 'Corner Coffee Shop', 'Whole Foods Grocery',
+    'Mercado Local', 'Shell Gas Station', 'City Parking', 'Pharmacy Plus',
+    'Online Store', 'Book Shop', 'Thai Restaurant', 'Pizza Place',
+    'Hardware Store', 'Cinema', 'Gym Membership', 'Phone Company',
+    'Electric Utility', 'Internet Provider', 'Airline Tickets', 'Hotel',
+    'Taxi Ride',
+)
+
+
+class Format(NamedTuple):
+    """A statement format: how to write one, and configure its importer."""
+    # key of the importer, as in config.toml
+    importer: str
+    # name of the generated file, which the importer must identify
+    fname: str
+    # write(path, rows, rng) writes a statement holding that many rows
+    write: Callable[[str, int, random.Random], None]
+    lastfour: str | None = None
+
+
+def _when(i: int, rows: int) -> datetime.datetime:
+    # spread the rows over a year, in order
+    return START + datetime.timedelta(minutes=i * 525_600 // max(rows, 1))
+
+
+def _merchant(rng: random.Random) -> str:
+    # N.B. store numbers keep descriptions from being (unrealistically) few
+    return f'{rng.choice(MERCHANTS)} #{rng.randrange(1000)}'
+
+
+def _cents(rng: random.Random, high: int = 50_000) -> str:
+    return f'{rng.randrange(1, high) / 100:.2f}'
+
+
+def _csv(
+        path: str,
+        header: list[str],
+        rows: Iterator[list[Any]],
+        **kwargs: Any,
+) -> None:
+    encoding = kwargs.pop('encoding', 'utf-8')
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f, **kwargs)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _chase_description(rng: random.Random) -> str:
+    kind = rng.randrange(10)
+    if kind == 0:
+        return (
+            'ORIG CO NAME:Acme Corp ORIG ID:123 DESC DATE:0101 CO ENTRY '
+            'DESCR:Salary SEC:PPD TRACE#:1 EED:1'
+        )
+    if kind == 1:
+        ref = rng.randrange(10**8)
+        return f'Online Transfer {ref} to Savings transaction #1'
+    if kind == 2:
+        return f'{_merchant(rng)} PPD ID: {rng.randrange(10**6)}'
+    return _merchant(rng)
+
+
+def chase(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Details', 'Posting Date', 'Description', 'Amount', 'Type',
+         'Balance', 'Check or Slip #'],
+        (
+            ['DEBIT', f'{_when(i, rows):%m/%d/%Y}', _chase_description(rng),
+             f'-{_cents(rng)}', 'DEBIT', '0', '']
+            for i in range(rows)
+        ),
+    )
+
+
+def amex(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Date', 'Description', 'Amount'],
+        (
+            [f'{_when(i, rows):%m/%d/%Y %a}', _merchant(rng), _cents(rng)]
+            for i in range(rows)
+        ),
+    )
+
+
+def brim(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['No.', 'Transaction Date', 'Posted Date', 'Description', 'Amount'],
+        (
+            [i + 1, f'{_when(i, rows):%Y-%m-%d}',
+             f'{_when(i, rows) + datetime.timedelta(days=1):%Y-%m-%d}',
+             _merchant(rng), _cents(rng)]
+            for i in range(rows)
+        ),
+    )
+
+
+def tangerine(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Date', 'Transaction', 'Name', 'Memo', 'Amount'],
+        (
+            [f'{_when(i, rows):%-m/%-d/%Y}', 'DEBIT', _merchant(rng), '',
+             f'-{_cents(rng)}']
+            for i in range(rows)
+        ),
+    )
+
+
+def rbc(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Account Type', 'Account Number', 'Transaction Date',
+         'Cheque Number', 'Description 1', 'Description 2', 'CAD$', 'USD$'],
+        (
+            ['Chequing', '00001-1231111', f'{_when(i, rows):%-m/%-d/%Y}', '',
+             _merchant(rng), rng.choice(('', 'Acme Inc')),
+             f'-{_cents(rng)}', '']
+            for i in range(rows)
+        ),
+    )
+
+
+def revolut(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Type', 'Product', 'Started Date', 'Completed Date', 'Description',
+         'Amount', 'Fee', 'Currency', 'State', 'Balance'],
+        (
+            ['CARD_PAYMENT', 'Current', f'{_when(i, rows):%Y-%m-%d %H:%M:%S}',
+             f'{_when(i, rows):%Y-%m-%d %H:%M:%S}', _merchant(rng),
+             f'-{_cents(rng)}', '0.00', 'EUR', 'COMPLETED', '100']
+            for i in range(rows)
+        ),
+    )
+
+
+def _paypal_rows(rows: int, rng: random.Random) -> Iterator[list[str]]:
+    # N.B. every payment comes with the two halves of its conversion, which
+    # the importer merges into a single transaction
+    for i in range(0, rows - 2, 3):
+        date = f'{_when(i, rows):%m/%d/%Y}'
+        eur, usd = _cents(rng), _cents(rng)
+        for name, kind, currency, amt in (
+                (_merchant(rng), 'Express Checkout Payment', 'EUR', f'-{eur}'),
+                ('', 'General Currency Conversion', 'EUR', eur),
+                ('', 'General Currency Conversion', 'USD', f'-{usd}'),
+        ):
+            yield [date, '10:00:00', 'PST', name, kind, 'Completed',
+                   currency, amt, '', '0']
+
+
+def paypal(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Date', 'Time', 'TimeZone', 'Name', 'Type', 'Status', 'Currency',
+         'Amount', 'Receipt ID', 'Balance'],
+        _paypal_rows(rows, rng),
+        encoding='utf-8-sig',
+        quoting=csv.QUOTE_ALL,
+    )
+
+
+def _remitbee_rows(rows: int, rng: random.Random) -> Iterator[list[str]]:
+    for i in range(rows):
+        date = f'{_when(i, rows):%b %d, %Y %I:%M %p}'
+        sent = rng.randrange(100, 100_000)
+        if i % 4 == 0:
+            yield [date, 'Amount received', '', '', f'{sent:,}.00 CAD']
+        else:
+            yield [date, 'Jane Doe', 'Philippines', f'{sent:,}.00 CAD',
+                   f'{sent * 40:,}.00 PHP']
+
+
+def remitbee(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['Date', 'Recipient', 'Country', 'Amount sent', 'Amount received'],
+        _remitbee_rows(rows, rng),
+    )
+
+
+def wealthsimple(path: str, rows: int, rng: random.Random) -> None:
+    _csv(
+        path,
+        ['date', 'transaction', 'description', 'amount', 'balance'],
+        (
+            [f'{_when(i, rows):%Y-%m-%d}', 'SPEND', _merchant(rng),
+             f'-{_cents(rng)}', '100.00']
+            for i in range(rows)
+        ),
+    )
+
+
+def wealthsimple_credit_card(
+        path: str,
+        rows: int,
+        rng: random.Random,
+) -> None:
+    _csv(
+        path,
+        ['transaction_date', 'post_date', 'type', 'details', 'amount',
+         'currency'],
+        (
+            [f'{_when(i, rows):%Y-%m-%d}', f'{_when(i, rows):%Y-%m-%d}',
+             rng.choice(('Purchase', 'Purchase', 'Payment', 'Refund settled')),
+             _merchant(rng), _cents(rng), 'CAD']
+            for i in range(rows)
+        ),
+    )
+
+
+def _xlsx(path: str, lines: Iterator[tuple[Any, ...]]) -> None:
+    # pylint: disable=import-outside-toplevel
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for line in lines:
+        ws.append(line)
+    wb.save(path)
+
+
+def activobank(path: str, rows: int, rng: random.Random) -> None:
+    _xlsx(path, iter([
+        ('Activobank export',),
+        (),
+        ('Launch Date', 'Value Date', 'Description', 'Value', 'Balance'),
+        *(
+            (_when(i, rows), _when(i, rows), _merchant(rng),
+             -float(_cents(rng)), 100)
+            for i in range(rows)
+        ),
+    ]))
+
+
+def milleniumbcp(path: str, rows: int, rng: random.Random) -> None:
+    _xlsx(path, iter([
+        ('Millennium',),
+        ('Transaction record date ', 'Value date', 'Description', 'Amount',
+         'Balance'),
+        *(
+            (_when(i, rows), _when(i, rows), _merchant(rng),
+             -float(_cents(rng)), 100)
+            for i in range(rows)
+        ),
+        ('Total',),
+    ]))
+
+
+# A cell of a line of a table: its x position, and its text.
+Cell = tuple[float, str]
+
+# N.B. any closer, and pdfminer lays out each column as a single text box
+LINE_HEIGHT = 14
+ROWS_PER_PAGE = 45
+
+
+def _filler() -> list[pdf.Item]:
+    return [
+        (60, 780 - LINE_HEIGHT * i, f'Terms and conditions, part {i}')
+        for i in range(ROWS_PER_PAGE)
+    ]
+
+
+def _paginate(
+        start: list[pdf.Item],
+        lines: list[list[Cell]],
+        end: str,
+        x: float,
+) -> list[list[pdf.Item]]:
+    """
+    Lay out lines of cells (x, text) as pages, from start to end markers.
+
+    The statement is surrounded by pages of filler, as the terms and
+    conditions pages of a real one would be.
+    """
+    pages: list[list[pdf.Item]] = [_filler()]
+    page = list(start)
+    for i, cells in enumerate(lines):
+        if i and i % ROWS_PER_PAGE == 0:
+            pages.append(page)
+            page = []
+        y = 680 - LINE_HEIGHT * (i % ROWS_PER_PAGE)
+        page.extend((cx, y, text) for cx, text in cells)
+
+    y = 680 - LINE_HEIGHT * (len(lines) % ROWS_PER_PAGE or ROWS_PER_PAGE) - 30
+    page.append((x, y, end))
+    pages.extend((page, _filler()))
+    return pages
+
+
+def eq(path: str, rows: int, rng: random.Random) -> None:
+    header = [
+        (60, 700, 'Date'), (150, 700, 'Description'),
+        (350, 700, 'Withdrawals'), (430, 700, 'Deposits'),
+        (510, 700, 'Balance'),
+    ]
+    lines: list[list[Cell]] = []
+    for i in range(rows):
+        withdrawal = rng.random() < 0.7
+        amt = f'${_cents(rng)}'
+        lines.append([
+            (60, f'{_when(i, rows):%b %-d, %Y}'),
+            (150, _merchant(rng)),
+            (350, f'-{amt}') if withdrawal else (430, amt),
+            (510, '$1,000.00'),
+        ])
+
+    pages = _paginate(
+        [(60, 760, 'Activity details'), *header],
+        lines,
+        'Equitable Bank Tower, 30 St Clair Ave W',
+        60,
+    )
+    with open(path, 'wb') as f:
+        f.write(pdf.write(pages))
+
+
+def santander(path: str, rows: int, rng: random.Random) -> None:
+    header = [
+        (40, 700, 'Data'), (85, 700, 'Descritivo'), (460, 700, 'Montante'),
+    ]
+    lines: list[list[Cell]] = [
+        [
+            (40, f'{_when(i, rows):%d-%m}'),
+            (85, _merchant(rng)),
+            (460, f'-{rng.randrange(1, 10_000)},{rng.randrange(100):02d}'),
+        ]
+        for i in range(rows)
+    ]
+
+    pages = _paginate(
+        [(40, 760, 'Detalhe de Movimentos da Conta à Ordem'), *header],
+        lines,
+        'Saldo Disponível Final 1.234,56',
+        40,
+    )
+    with open(path, 'wb') as f:
+        f.write(pdf.write(pages))
+
+
+FORMATS = {
+    'activobank': Format(
+        'activobank', 'mov1234569999-2024-01.xlsx', activobank, '9999',
+    ),
+    'amex': Format('amex', 'Transactions2024.csv', amex),
+    'brim': Format('brim', 'statement-ABC123-202401.csv', brim),
+    'chase': Format('chase', 'Chase1234_Activity_20240101.CSV', chase, '1234'),
+    'eq': Format('eq', '123 Savings Statement.pdf', eq),
+    'milleniumbcp': Format('milleniumbcp', 'MOVS_1_2024.xlsx', milleniumbcp),
+    'paypal': Format('paypal', 'Download.CSV', paypal),
+    'rbc': Format('rbc', 'rbc1111.csv123.csv', rbc, '1111'),
+    'remitbee': Format('remitbee', 'transaction_history_2024.csv', remitbee),
+    'revolut': Format('revolut', 'account-statement_2024.csv', revolut),
+    'santander': Format(
+        'santander', 'EXTCON2024010100011234567890001234.pdf', santander,
+        '1234',
+    ),
+    'tangerine': Format('tangerine', 'xxxx5678.CSV', tangerine, '5678'),
+    'wealthsimple': Format(
+        'wealthsimple',
+        'monthly-statement-transactions-HQ123ABCDXYZ-2024-01-01.csv',
+        wealthsimple,
+        'ABCD',
+    ),
+    'wealthsimple-credit-card': Format(
+        'wealthsimple-credit-card',
+        'credit-card-statement-transactions-2024-01-31.csv',
+        wealthsimple_credit_card,
+    ),
+}
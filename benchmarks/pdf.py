@@ -0,0 +1,70 @@
+from collections.abc import Sequence
+
+
+# A text item: x and y position in points, and its text.
+Item = tuple[float, float, str]
+
+WIDTH, HEIGHT = 595, 842
+
+
+def _escape(text: str) -> bytes:
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('cp1252')
+
+
+def write(pages: Sequence[Sequence[Item]]) -> bytes:
+    """
+    Lay out text items as a minimal PDF document.
+
+    Every page shares a single Helvetica font in WinAnsiEncoding, which is as
+    simple as a real statement gets while still going through all of the
+    font decoding and layout analysis done by pdfminer.
+    """
+    # pylint: disable=too-many-locals
+    objects: list[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    font = add(
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+        b'/Encoding /WinAnsiEncoding >>',
+    )
+    # N.B. each page is a content stream plus the page itself
+    parent = len(objects) + 2 * len(pages) + 1
+    kids = []
+    for items in pages:
+        stream = b'\n'.join(
+            b'BT /F1 9 Tf %.2f %.2f Td (%s) Tj ET' % (x, y, _escape(text))
+            for x, y, text in items
+        )
+        contents = add(
+            b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        )
+        kids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+            % (parent, WIDTH, HEIGHT, font, contents),
+        ))
+    add(
+        b'<< /Type /Pages /Kids [%s] /Count %d >>'
+        % (b' '.join(b'%d 0 R' % x for x in kids), len(kids)),
+    )
+    catalog = add(b'<< /Type /Catalog /Pages %d 0 R >>' % parent)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (i, obj)
+
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += (
+        b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+        % (len(objects) + 1, catalog, xref)
+    )
+    return bytes(out)
@@ -0,0 +1,118 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from typing import Any
+
+
+# The dependencies which importers load lazily, see LazyImporters.
+HEAVY = ('dateutil', 'openpyxl', 'pdfminer', 'py_pdf_parser', 'titlecase')
+
+# N.B. only CSV importers, so that none of HEAVY should be needed
+CONFIG = """\
+[beancount-importer]
+patterns = [['either', 'Expenses:Coffee', '(?i)coffee']]
+
+[[beancount-importer.chase]]
+account = 'Liabilities:Chase'
+lastfour = '1234'
+
+[[beancount-importer.tangerine]]
+account = 'Assets:Tangerine'
+lastfour = '5678'
+"""
+
+LEDGER = """\
+2020-01-01 open Liabilities:Chase
+2020-01-01 open Assets:Tangerine
+2020-01-01 open Expenses:Coffee
+
+2024-01-02 * "Coffee"
+  Liabilities:Chase  -3.50 USD
+  Expenses:Coffee
+
+2024-01-03 * "Coffee"
+  Assets:Tangerine  -3.50 USD
+  Expenses:Coffee
+"""
+
+# The commands to time, run from a ledger folder holding a CSV statement.
+COMMANDS = {
+    'help': ['--help'],
+    'howto': ['howto', 'chase'],
+    'identify-csv': ['identify', 'statements'],
+}
+
+# Run bean-import in a fresh interpreter, recording which of HEAVY it loaded.
+# Eagerly importing every importer (and their dependencies) up front mimics
+# the package before they were loaded lazily, for comparison.
+_SCRIPT = """\
+import atexit, json, sys
+def report():
+    with open(sys.argv[1], 'w') as f:
+        json.dump([x for x in {heavy!r} if x in sys.modules], f)
+atexit.register(report)
+if sys.argv[2] == 'eager':
+    import beancount_importer, dateutil.parser, openpyxl, titlecase
+    import beancount_importer.pdf
+    for name in beancount_importer.__all__:
+        getattr(beancount_importer, name)
+from beancount_importer.cli import run
+run(sys.argv[3:], prog_name='bean-import')
+"""
+
+
+def _ledger(path: str, statement: str) -> None:
+    with open(os.path.join(path, 'config.toml'), 'w', encoding='utf-8') as f:
+        f.write(CONFIG)
+    with open(os.path.join(path, 'index.beancount'), 'w',
+              encoding='utf-8') as f:
+        f.write(LEDGER)
+    os.makedirs(os.path.join(path, 'statements'))
+    os.rename(statement, os.path.join(path, 'statements', 'statement.csv'))
+
+
+def _time(
+        path: str,
+        mode: str,
+        args: list[str],
+        repeat: int,
+) -> tuple[float, list[str]]:
+    """Run bean-import, returning its median wall time and heavy imports."""
+    script = _SCRIPT.format(heavy=HEAVY)
+    report = os.path.join(path, 'imported.json')
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', script, report, mode, *args],
+            cwd=path, check=True, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+
+    with open(report, encoding='utf-8') as f:
+        return statistics.median(times), json.load(f)
+
+
+def measure(statement: str, repeat: int) -> Iterator[tuple[str, Any]]:
+    """
+    Time each of COMMANDS, both as shipped and with everything loaded eagerly.
+
+    The statement (a CSV file which the chase importer identifies) is moved
+    into a scratch ledger folder.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        _ledger(tmp, statement)
+        for name, args in COMMANDS.items():
+            lazy, imported = _time(tmp, 'lazy', args, repeat)
+            eager, _ = _time(tmp, 'eager', args, repeat)
+            yield name, {
+                'lazy_ms': round(lazy * 1000, 1),
+                'eager_ms': round(eager * 1000, 1),
+                'imported': imported,
+            }
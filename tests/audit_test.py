@@ -0,0 +1,23 @@
+import re
+
+import pytest
+
+from beancount_importer.audit import risks
+
+
+@pytest.mark.parametrize(('pattern', 'expected'), [
+    ('^Coffee$', []),
+    ('^(?:\\w+ ?)*$', ['nested quantifiers']),
+    ('^a.*.*b', ['adjacent overlapping quantifiers']),
+    ('^a\\d+\\d+b', ['adjacent overlapping quantifiers']),
+    ('^a\\d+\\s+b', []),
+    ('.*Coffee', ['unanchored leading quantifier']),
+    ('[a-z]+Coffee', ['unanchored leading quantifier']),
+    ('Coffee.*', []),
+    # repeats of nothing
+    ('(?:)*x', []),
+    ('a*(?:)*', []),
+    ('(?:)*(?:)*', []),
+])
+def test_risks(pattern: str, expected: list[str]) -> None:
+    assert risks(re.compile(pattern)) == expected
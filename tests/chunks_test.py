@@ -0,0 +1,72 @@
+import concurrent.futures
+import csv
+import pathlib
+from typing import Any
+
+import pytest
+from beancount.core import data
+
+from beancount_importer import chunks
+from beancount_importer.chase import ChaseImporter
+
+
+HEADER = [
+    'Details', 'Posting Date', 'Description', 'Amount', 'Type', 'Balance',
+    'Check or Slip #',
+]
+# N.B. enough for several chunks after the first, which is up to 64KiB
+ROWS = 3000
+CHUNK_SIZE = 4096
+
+
+@pytest.fixture(name='statement')
+def statement_fixture(tmp_path: pathlib.Path) -> str:
+    fname = str(tmp_path / 'Chase1234_Activity_20240101.CSV')
+    with open(fname, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(ROWS):
+            # N.B. some quoted values span lines, so rows and lines differ
+            description = f'Coffee Shop #{i}' + ('\nRefund' * (i % 7 == 0))
+            writer.writerow([
+                'DEBIT', f'01/{i % 28 + 1:02}/2024', description,
+                f'-{i}.50', 'DEBIT', '0', '',
+            ])
+    return fname
+
+
+def _extract(fname: str, chunk_jobs: int | None) -> list[data.Transaction]:
+    importer = ChaseImporter(
+        'Liabilities:Chase', lastfour='1234', chunk_size=CHUNK_SIZE,
+    )
+    importer.chunk_jobs = chunk_jobs
+    assert importer.chunked(fname)
+    planned = chunks.plan(fname, CHUNK_SIZE)
+    assert planned is not None
+    _header, parts = planned
+    assert len(parts) > 2
+    return list(importer.iter_extract(fname))
+
+
+def _no_pool(*_: Any, **__: Any) -> None:
+    raise AssertionError('started a pool')
+
+
+@pytest.mark.parametrize('chunk_jobs', [1, 2])
+def test_chunks_match_whole_file(
+        statement: str,
+        chunk_jobs: int,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # N.B. files are only chunked when there are several cores
+    monkeypatch.setattr('os.cpu_count', lambda: 4)
+    if chunk_jobs == 1:
+        monkeypatch.setattr(
+            concurrent.futures, 'ProcessPoolExecutor', _no_pool,
+        )
+
+    whole = ChaseImporter('Liabilities:Chase', lastfour='1234')
+    expected = list(whole.iter_extract(statement))
+    assert len(expected) == ROWS
+    # including the metadata, ie. the filename and line of each row
+    assert _extract(statement, chunk_jobs) == expected
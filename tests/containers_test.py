@@ -0,0 +1,29 @@
+import os
+import pathlib
+
+from beancount_importer.containers import JAVA_SERIALIZED
+from beancount_importer.containers import unwrap
+
+
+PAYLOAD = b'%PDF-1.4\n' + bytes(range(256)) * 64
+
+
+def test_unwrap(tmp_path: pathlib.Path) -> None:
+    fname = tmp_path / 'statement.pdf'
+    fname.write_bytes(JAVA_SERIALIZED.magic + b'\x75\x72\x00\x02' + PAYLOAD)
+    # N.B. the map is closed on the way out, once nothing views it anymore
+    with unwrap(str(fname), (JAVA_SERIALIZED,)) as f:
+        assert f.read(5) == b'%PDF-'
+        assert f.read() == PAYLOAD[5:]
+        assert f.read() == b''
+        f.seek(-4, os.SEEK_END)
+        assert f.read() == PAYLOAD[-4:]
+        f.seek(0)
+        assert f.read() == PAYLOAD
+
+
+def test_unwrap_plain_files(tmp_path: pathlib.Path) -> None:
+    fname = tmp_path / 'statement.pdf'
+    fname.write_bytes(PAYLOAD)
+    with unwrap(str(fname), (JAVA_SERIALIZED,)) as f:
+        assert f.read() == PAYLOAD
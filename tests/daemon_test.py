@@ -0,0 +1,92 @@
+import pathlib
+
+import pytest
+from beancount.core import data
+from beangulp.extract import DUPLICATE  # type: ignore[import-untyped]
+
+from beancount_importer.cli import Ctx
+from beancount_importer.daemon import Daemon
+
+
+CONFIG = """\
+[beancount-importer]
+manifest = '.manifest.json'
+
+[[beancount-importer.chase]]
+account = 'Liabilities:Chase'
+lastfour = '1234'
+"""
+
+LEDGER = """\
+2020-01-01 open Liabilities:Chase
+
+2024-01-02 * "Coffee Shop"
+  Liabilities:Chase  -3.50 USD
+"""
+
+STATEMENT = """\
+Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #
+DEBIT,01/02/2024,Coffee Shop,-3.50,DEBIT,0,
+DEBIT,01/03/2024,Book Shop,-12.00,DEBIT,0,
+"""
+
+EXTRACT = ['extract', '--force', '-e', 'index.beancount', 'statements']
+
+
+@pytest.fixture(name='daemon')
+def daemon_fixture(
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+) -> Daemon:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'config.toml').write_text(CONFIG, encoding='utf-8')
+    (tmp_path / 'index.beancount').write_text(LEDGER, encoding='utf-8')
+    (tmp_path / 'statements').mkdir()
+    (tmp_path / 'statements' / 'Chase1234_Activity_20240101.CSV').write_text(
+        STATEMENT, encoding='utf-8',
+    )
+    return Daemon(Ctx())
+
+
+def test_runs_keep_parsed_statements(
+        daemon: Daemon,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (importer,) = daemon.ctx.importers
+    parse = importer._parse  # pylint: disable=protected-access
+    parsed = []
+
+    def spy(fname: str) -> list[data.Transaction]:
+        parsed.append(fname)
+        return parse(fname)
+
+    monkeypatch.setattr(importer, '_parse', spy)
+    outputs = []
+    for _ in range(2):
+        assert daemon.run(EXTRACT) == 0
+        outputs.append(capsys.readouterr().out)
+
+    assert len(parsed) == 1
+    assert outputs[0] == outputs[1]
+    assert outputs[0].count('; duplicate of') == 1
+
+
+def test_cached_entries_are_not_marked(daemon: Daemon) -> None:
+    (importer,) = daemon.ctx.importers
+    (fname,) = pathlib.Path('statements').iterdir()
+    for entry in importer.extract(str(fname), []):
+        entry.meta[DUPLICATE] = True
+    entries = importer.extract(str(fname), [])
+    assert not any(DUPLICATE in x.meta for x in entries)
+
+
+def test_failed_runs_reload_the_manifest(daemon: Daemon) -> None:
+    manifest = daemon.ctx.manifest
+    assert daemon.run(['extract', 'missing']) == 2
+    daemon.refresh()
+    assert daemon.ctx.manifest is not manifest
+
+    manifest = daemon.ctx.manifest
+    daemon.refresh()
+    assert daemon.ctx.manifest is manifest
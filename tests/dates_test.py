@@ -0,0 +1,23 @@
+import dateutil.parser
+import pytest
+
+from beancount_importer.dates import DateParser
+
+
+@pytest.mark.parametrize('rows', [
+    ['13/02/2024', '01/02/2024', '02/01/2024', '25/12/2024'],
+    ['01/02/2024', '13/02/2024', '02/01/2024', '25/12/2024'],
+    ['02-01-2024', '13-01-2024', '01-02-2024'],
+    ['2024-01-02', '2024-02-01', '2024-12-25'],
+])
+def test_matches_dateutil_in_any_order(rows: list[str]) -> None:
+    for order in (rows, rows[::-1]):
+        parse = DateParser()
+        for raw in order:
+            assert parse(raw) == dateutil.parser.parse(raw)
+
+
+def test_sniffs_unambiguous_format() -> None:
+    parse = DateParser()
+    parse('2024-01-02')
+    assert parse.format == '%Y-%m-%d'
@@ -0,0 +1,97 @@
+import datetime
+import io
+
+import beangulp.extract  # type: ignore[import-untyped]
+import beangulp.similar  # type: ignore[import-untyped]
+import pytest
+from beancount.core import amount
+from beancount.core import data
+from beancount.core import number
+from beangulp.extract import DUPLICATE
+
+from beancount_importer.chase import ChaseImporter
+from beancount_importer.dedupe import Index
+from beancount_importer.dedupe import Overlaps
+from beancount_importer.writer import Writer
+
+
+ACCOUNT = 'Liabilities:Chase'
+DATE = datetime.date(2024, 1, 2)
+
+
+def _coffee(
+        fname: str,
+        lineno: int,
+        date: datetime.date = DATE,
+) -> data.Transaction:
+    units = amount.Amount(number.D('-3.50'), 'USD')
+    return data.Transaction(
+        data.new_metadata(fname, lineno), date, '*', 'Coffee', '',
+        data.EMPTY_SET, data.EMPTY_SET,
+        [data.Posting(ACCOUNT, units, None, None, None, None)],
+    )
+
+
+def _deduplicate(
+        existing: list[data.Directive],
+        files: dict[str, int],
+) -> dict[str, list[data.Transaction]]:
+    # N.B. the context is only used to write entries out
+    writer = Writer(
+        None,  # type: ignore[arg-type]
+        existing, io.StringIO(), lambda *_, **__: None, None, False,
+    )
+    importer = ChaseImporter(ACCOUNT, lastfour='1234')
+    extracted = {}
+    for fname, count in files.items():
+        entries = [_coffee(fname, i) for i in range(count)]
+        writer.deduplicate((fname, entries, ACCOUNT, importer))
+        extracted[fname] = entries
+    return extracted
+
+
+def test_overlaps_match_identical_rows_by_ordinal() -> None:
+    overlaps = Overlaps()
+    first = [_coffee('a.csv', i) for i in range(2)]
+    second = [_coffee('b.csv', i) for i in range(3)]
+    assert overlaps.mark(first) == first
+    # the third coffee is new, but already has identical rows in a.csv
+    assert not overlaps.mark(second)
+    assert [DUPLICATE in x.meta for x in second] == [True, True, False]
+
+
+def test_extra_identical_rows_are_checked_against_the_ledger() -> None:
+    ledger: list[data.Directive] = [_coffee('index.beancount', 1)]
+    extracted = _deduplicate(ledger, {'a.csv': 2, 'b.csv': 3})
+    for entries in extracted.values():
+        assert all(DUPLICATE in x.meta for x in entries)
+    assert extracted['b.csv'][2].meta[DUPLICATE] is ledger[0]
+
+
+def test_extra_identical_rows_are_kept_without_ledger() -> None:
+    extracted = _deduplicate([], {'a.csv': 2, 'b.csv': 3})
+    assert not any(DUPLICATE in x.meta for x in extracted['a.csv'])
+    assert [DUPLICATE in x.meta for x in extracted['b.csv']] == [
+        True, True, False,
+    ]
+
+
+@pytest.mark.parametrize('days', [
+    [0, 0],
+    [-1, 0, 1],
+    [2, 0, -2],
+    [1, 1, -1, 0],
+])
+def test_index_points_where_beangulp_does(days: list[int]) -> None:
+    ledger: list[data.Directive] = [
+        _coffee('index.beancount', i, DATE + datetime.timedelta(days=x))
+        for i, x in enumerate(days)
+    ]
+    ours = _coffee('a.csv', 0)
+    Index(ledger).mark([ours], 2)
+    theirs = _coffee('a.csv', 0)
+    beangulp.extract.mark_duplicate_entries(
+        [theirs], sorted(ledger, key=lambda x: x.date),
+        datetime.timedelta(days=2), beangulp.similar.heuristic_comparator(),
+    )
+    assert ours.meta[DUPLICATE] is theirs.meta[DUPLICATE]
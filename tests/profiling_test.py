@@ -0,0 +1,23 @@
+import pathlib
+
+from beancount_importer.chase import ChaseImporter
+from beancount_importer.profiling import Profiler
+
+
+STATEMENT = """\
+Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #
+DEBIT,01/02/2024,Coffee Shop,-3.50,DEBIT,0,
+DEBIT,01/03/2024,Book Shop,-12.00,DEBIT,0,
+"""
+
+
+def test_streamed_stages_are_measured(tmp_path: pathlib.Path) -> None:
+    fname = tmp_path / 'Chase1234_Activity_20240101.CSV'
+    fname.write_text(STATEMENT, encoding='utf-8')
+    importer = ChaseImporter('Liabilities:Chase', lastfour='1234')
+    importer.profiler = Profiler()
+
+    entries = list(importer.iter_extract(str(fname)))
+    assert len(entries) == 2
+    stages = [(x.stage, x.rows_out) for x in importer.profiler.stages]
+    assert stages == [('extract', 2), ('filter', 2), ('postings', 2)]